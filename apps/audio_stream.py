@@ -0,0 +1,101 @@
+"""
+Decode YouTube audio streams on the fly, without temporary files
+"""
+import os
+import logging
+import threading
+import subprocess
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from apps.chunking import find_chunk_boundaries, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+# Bytes of 16-bit PCM read from ffmpeg at a time (one second of audio)
+PCM_READ_BYTES = SAMPLE_RATE * 2
+
+def iter_pcm(url: str) -> Iterator[np.ndarray]:
+    """
+    Pipe an audio stream URL through ffmpeg and yield 16 kHz mono float32 blocks
+
+    A feeder thread downloads the stream (through pytube's request helpers and
+    so the shared HTTP pool) into ffmpeg's stdin while decoded samples are read
+    from its stdout, so nothing is written to disk.
+    """
+    from pytube import request as pytube_request
+
+    process = subprocess.Popen(
+        [
+            FFMPEG_BINARY, "-nostdin", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+            "pipe:1"
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    feed_errors = []
+
+    def feed():
+        try:
+            for chunk in pytube_request.stream(url):
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg exited or the reader stopped early
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except Exception:
+                pass
+
+    feeder = threading.Thread(target=feed, name="audio-stream-feeder", daemon=True)
+    feeder.start()
+
+    finished = False
+    try:
+        while True:
+            data = process.stdout.read(PCM_READ_BYTES)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        finished = True
+    finally:
+        if not finished and process.poll() is None:
+            process.kill()
+        process.wait()
+        feeder.join(timeout=5)
+
+    if feed_errors:
+        raise feed_errors[0]
+    if process.returncode != 0:
+        stderr = process.stderr.read().decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"ffmpeg failed to decode audio stream: {stderr or process.returncode}")
+
+def iter_stream_windows(url: str, window_seconds: float) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Group decoded PCM into windows cut at silences as it arrives
+
+    Yields (start_sample, samples) pairs, suitable for chunking.transcribe_windows.
+    """
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0
+    for block in iter_pcm(url):
+        buffer = np.concatenate([buffer, block])
+        bounds = find_chunk_boundaries(buffer, window_seconds)
+        # Emit every complete window; keep the tail until more audio arrives
+        while len(bounds) > 1:
+            cut = bounds[0][1]
+            yield offset, buffer[:cut]
+            offset += cut
+            buffer = buffer[cut:]
+            bounds = find_chunk_boundaries(buffer, window_seconds)
+
+    if len(buffer):
+        for start, end in find_chunk_boundaries(buffer, window_seconds):
+            yield offset + start, buffer[start:end]
@@ -0,0 +1,198 @@
+"""
+Speech-to-text engines behind a common fetch/load/transcribe interface
+"""
+import os
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Engine used when a request doesn't name one
+TRANSCRIPTION_BACKEND = os.environ.get('TRANSCRIPTION_BACKEND', 'whisper').lower()
+# Where model weights are downloaded and looked up (default: each engine's own cache)
+WHISPER_MODEL_DIR = os.environ.get('WHISPER_MODEL_DIR') or None
+# Dynamically quantize the openai-whisper model's Linear layers to int8 at load time:
+# true, false, or a comma-separated list of model names (e.g. "small,medium")
+WHISPER_QUANTIZE = os.environ.get('WHISPER_QUANTIZE', 'false').strip().lower()
+# CTranslate2 weight type for the faster-whisper engine (int8, int8_float32, float32, ...)
+CT2_COMPUTE_TYPE = os.environ.get('CT2_COMPUTE_TYPE', 'int8')
+# CTranslate2 threads per model; 0 lets CTranslate2 decide
+CT2_CPU_THREADS = int(os.environ.get('CT2_CPU_THREADS', '0'))
+
+def format_whisper_result(result: dict) -> dict:
+    """Reduce a Whisper result to plain, JSON-serializable text, language and segments"""
+    return {
+        "text": result["text"],
+        "language": result.get("language"),
+        "segments": [
+            {"start": float(segment["start"]), "end": float(segment["end"]), "text": segment["text"]}
+            for segment in result.get("segments", [])
+        ]
+    }
+
+def should_quantize(model_name: str) -> bool:
+    """Whether WHISPER_QUANTIZE enables int8 dynamic quantization for this model"""
+    if WHISPER_QUANTIZE in ("true", "1", "yes", "all"):
+        return True
+    if WHISPER_QUANTIZE in ("", "false", "0", "no", "none"):
+        return False
+    return model_name.lower() in {name.strip() for name in WHISPER_QUANTIZE.split(",")}
+
+def quantize_whisper_model(model: Any) -> Any:
+    """
+    Replace a CPU Whisper model's Linear layers with int8 dynamically quantized ones, in place
+
+    Weights are stored as int8 and activations are quantized per batch at
+    inference time, which speeds up the attention and MLP matmuls that
+    dominate CPU decoding. Convolutions, layer norms and the token embedding
+    stay fp32.
+    """
+    import torch
+
+    for module in model.modules():
+        # Whisper's Linear subclass only adds a dtype cast for fp16; quantize_dynamic
+        # matches exact types, so rebase it onto nn.Linear to have it swapped
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+def load_whisper_model(model_name: str, quantize: Optional[bool] = None) -> Any:
+    """
+    Load a Whisper model from WHISPER_MODEL_DIR, downloading (and checksum-verifying) it if missing
+
+    Args:
+        model_name: Whisper model name or checkpoint path
+        quantize: Apply int8 dynamic quantization (CPU only); None follows WHISPER_QUANTIZE
+    """
+    import whisper
+
+    if quantize is None:
+        quantize = should_quantize(model_name)
+    if not quantize:
+        return whisper.load_model(model_name, download_root=WHISPER_MODEL_DIR)
+    model = whisper.load_model(model_name, device="cpu", download_root=WHISPER_MODEL_DIR)
+    logger.info(f"Quantizing Whisper model {model_name} to int8")
+    return quantize_whisper_model(model.eval())
+
+class TranscriptionBackend:
+    """
+    A speech-to-text engine
+
+    transcribe() takes a file path or 16 kHz float32 samples plus Whisper-style
+    decode options (language, task, initial_prompt, ...) and returns the
+    format_whisper_result shape, so cached results and chunk merging don't
+    depend on the engine.
+    """
+    name = None
+
+    def fetch(self, model_name: str) -> str:
+        """Download the model's weights if missing and return their location"""
+        raise NotImplementedError
+
+    def load(self, model_name: str) -> Any:
+        raise NotImplementedError
+
+    def transcribe(self, model: Any, audio: Any, options: dict) -> dict:
+        raise NotImplementedError
+
+    def cache_tag(self, model_name: str) -> str:
+        """Identifies the engine and its settings in result cache keys"""
+        return self.name
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper on PyTorch (fp32 on CPU, or int8 Linear layers with WHISPER_QUANTIZE)"""
+    name = "whisper"
+
+    def fetch(self, model_name: str) -> str:
+        import whisper
+
+        if os.path.isfile(model_name):
+            return model_name
+        url = whisper._MODELS.get(model_name)
+        if url is None:
+            raise ValueError(f"Unknown Whisper model: {model_name} (available: {', '.join(whisper.available_models())})")
+        root = WHISPER_MODEL_DIR or os.path.join(
+            os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "whisper"
+        )
+        # Whisper's downloader compares the file's SHA-256 with the checksum in
+        # the model URL and downloads again when they differ
+        return whisper._download(url, root, False)
+
+    def load(self, model_name: str) -> Any:
+        return load_whisper_model(model_name)
+
+    def transcribe(self, model: Any, audio: Any, options: dict) -> dict:
+        return format_whisper_result(model.transcribe(audio, **options))
+
+    def cache_tag(self, model_name: str) -> str:
+        return f"{self.name}-int8" if should_quantize(model_name) else self.name
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """Whisper converted to CTranslate2 (faster-whisper), int8 on CPU by default"""
+    name = "faster-whisper"
+
+    def fetch(self, model_name: str) -> str:
+        from faster_whisper import download_model
+
+        if os.path.isdir(model_name):
+            return model_name
+        # Files are fetched from the Hugging Face Hub, which checks them against the published hashes
+        return download_model(model_name, cache_dir=WHISPER_MODEL_DIR)
+
+    def load(self, model_name: str) -> Any:
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=CT2_COMPUTE_TYPE,
+            cpu_threads=CT2_CPU_THREADS,
+            download_root=WHISPER_MODEL_DIR
+        )
+
+    def transcribe(self, model: Any, audio: Any, options: dict) -> dict:
+        options = dict(options)
+        # openai-whisper decodes greedily unless told otherwise; faster-whisper
+        # defaults to beam search, so match the default engine's speed/quality point
+        options.setdefault("beam_size", 1)
+        segments, info = model.transcribe(audio, **options)
+        segments = [
+            {"start": float(segment.start), "end": float(segment.end), "text": segment.text}
+            for segment in segments  # Decoding happens while this generator is consumed
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "language": info.language,
+            "segments": segments
+        }
+
+    def cache_tag(self, model_name: str) -> str:
+        return f"{self.name}-{CT2_COMPUTE_TYPE}"
+
+BACKENDS: Dict[str, TranscriptionBackend] = {
+    backend.name: backend for backend in (WhisperBackend(), FasterWhisperBackend())
+}
+
+def resolve_backend(name: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Validate a backend name from a request or the environment
+
+    Returns:
+        Tuple of (backend_name, error_message); no name means TRANSCRIPTION_BACKEND
+    """
+    name = (name or TRANSCRIPTION_BACKEND).strip().lower().replace("_", "-")
+    if name not in BACKENDS:
+        return None, f"Unknown transcription backend: {name} (available: {', '.join(BACKENDS)})"
+    return name, None
+
+def get_backend(name: Optional[str] = None) -> TranscriptionBackend:
+    """The backend object for a name (default when None); raises ValueError for unknown names"""
+    name, error = resolve_backend(name)
+    if error:
+        raise ValueError(error)
+    return BACKENDS[name]
+
+# Fail at startup (servers, workers, warmup) rather than on the first extraction
+_, _default_error = resolve_backend()
+if _default_error:
+    raise ValueError(f"Invalid TRANSCRIPTION_BACKEND setting: {_default_error}")
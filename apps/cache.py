@@ -0,0 +1,175 @@
+"""
+Persistent transcript cache backed by SQLite
+"""
+import os
+import json
+import zlib
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional, Any, Dict
+
+logger = logging.getLogger(__name__)
+
+class TranscriptCache:
+    """
+    SQLite store for transcript results with TTL expiry and LRU eviction
+
+    Entries are grouped by namespace and stored as zlib-compressed JSON blobs.
+    When the total payload size goes over max_bytes, the least recently
+    accessed entries are evicted first.
+    """
+
+    def __init__(self, path: str, max_bytes: int, default_ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # One shared connection guarded by a lock, so Flask threads and
+        # MCP tasks can use the same cache object
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+        self._conn.commit()
+
+    def _count(self, namespace: str, counter: str, amount: int = 1):
+        """Increment a per-namespace counter (caller holds the lock)"""
+        counters = self._stats.setdefault(
+            namespace, {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        )
+        counters[counter] += amount
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT payload, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+
+                if row is None:
+                    self._count(namespace, "misses")
+                    return None
+
+                payload, expires_at = row
+                if expires_at <= now:
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                    )
+                    self._conn.commit()
+                    self._count(namespace, "expired")
+                    self._count(namespace, "misses")
+                    return None
+
+                self._conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+                self._conn.commit()
+                self._count(namespace, "hits")
+            except sqlite3.Error as e:
+                logger.warning(f"Transcript cache read failed for {namespace}:{key}: {str(e)}")
+                self._count(namespace, "misses")
+                return None
+
+        return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """Store a JSON-serializable value, evicting old entries if over budget"""
+        payload = zlib.compress(json.dumps(value).encode("utf-8"))
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO entries
+                        (namespace, key, payload, size, created_at, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (namespace, key, payload, len(payload), now, expires_at, now)
+                )
+                self._count(namespace, "stores")
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Transcript cache write failed for {namespace}:{key}: {str(e)}")
+
+    def delete(self, namespace: str, key: str):
+        """Remove a single entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._conn.commit()
+
+    def clear(self, namespace: Optional[str] = None):
+        """Remove all entries, or all entries in one namespace"""
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under budget (caller holds the lock)"""
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT namespace, key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+        for namespace, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self._count(namespace, "evictions")
+            total -= size
+
+    def stats(self) -> dict:
+        """Return hit/miss counters along with entry count and total size"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            namespaces = {name: dict(counters) for name, counters in self._stats.items()}
+
+        hits = sum(c["hits"] for c in namespaces.values())
+        misses = sum(c["misses"] for c in namespaces.values())
+        return {
+            "path": self.path,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "namespaces": namespaces
+        }
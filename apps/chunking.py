@@ -0,0 +1,191 @@
+"""
+Parallel chunked transcription of long audio
+"""
+import os
+import logging
+import functools
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import List, Tuple, Iterator, Iterable, Callable, Optional, TYPE_CHECKING
+
+from apps.workers import get_worker_pool
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Split long audio into chunks of roughly this many seconds
+CHUNKED_TRANSCRIPTION = os.environ.get('CHUNKED_TRANSCRIPTION', 'false').lower() == 'true'
+CHUNK_SECONDS = float(os.environ.get('TRANSCRIBE_CHUNK_SECONDS', '300'))
+# Maximum number of chunks transcribed at the same time
+CHUNK_PARALLELISM = int(os.environ.get('TRANSCRIBE_CHUNK_PARALLELISM', str(os.cpu_count() or 1)))
+# How far around each target boundary to look for a silence
+SILENCE_SEARCH_SECONDS = 10.0
+# Frames at or below this RMS level (about -40 dBFS) count as silence
+SILENCE_RMS = 0.01
+# Length of the frames used to measure loudness
+FRAME_SECONDS = 0.1
+# Shortest chunk or stream window accepted from the settings, in seconds
+MIN_CHUNK_SECONDS = 1.0
+
+SAMPLE_RATE = 16000  # Whisper's input sample rate
+
+def check_chunk_seconds(setting: str, seconds: float) -> float:
+    """Reject chunk lengths too short to split audio at silences; raises ValueError"""
+    if not seconds >= MIN_CHUNK_SECONDS:
+        raise ValueError(f"Invalid {setting} setting: {seconds} (must be at least {MIN_CHUNK_SECONDS:g} seconds)")
+    return seconds
+
+check_chunk_seconds('TRANSCRIBE_CHUNK_SECONDS', CHUNK_SECONDS)
+
+def find_chunk_boundaries(
+    audio: "np.ndarray",
+    chunk_seconds: float = CHUNK_SECONDS,
+    search_seconds: float = SILENCE_SEARCH_SECONDS
+) -> List[Tuple[int, int]]:
+    """
+    Split 16 kHz audio into (start, end) sample ranges at silence boundaries
+
+    Each cut is placed at the silent frame nearest the nominal chunk boundary
+    within search_seconds of it (the quietest frame when none is below
+    SILENCE_RMS), so words are not split across chunks and chunks stay close
+    to chunk_seconds long. The search is narrowed to under half a chunk, so
+    every chunk is longer than half of chunk_seconds and the cuts always
+    advance.
+    """
+    if chunk_seconds < FRAME_SECONDS:
+        raise ValueError(f"Chunk length must be at least {FRAME_SECONDS} seconds, got {chunk_seconds}")
+    total = len(audio)
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    chunk = int(chunk_seconds * SAMPLE_RATE)
+    search = min(int(search_seconds / FRAME_SECONDS), max(chunk // frame // 2 - 1, 0))
+    if total <= chunk + search * frame:
+        return [(0, total)]
+
+    import numpy as np
+
+    frames = total // frame
+    rms = np.sqrt(np.mean(audio[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+
+    cuts = []
+    target = chunk
+    while target < total - chunk // 2:
+        center = target // frame
+        low, high = max(center - search, 1), min(center + search, frames - 1)
+        if high > low:
+            window = rms[low:high]
+            # Every frame this quiet is a valid cut; take the one closest to the target
+            silent = np.flatnonzero(window <= max(SILENCE_RMS, float(window.min())))
+            cut = (low + int(silent[np.argmin(np.abs(low + silent - center))])) * frame
+        else:
+            cut = target
+        cuts.append(cut)
+        target = cut + chunk
+
+    starts = [0] + cuts
+    ends = cuts + [total]
+    return list(zip(starts, ends))
+
+def transcribe_windows(
+    windows: Iterable[Tuple[int, "np.ndarray"]],
+    options: dict,
+    submit: Callable[["np.ndarray", dict], Future],
+    parallelism: int = CHUNK_PARALLELISM
+) -> Iterator[dict]:
+    """
+    Transcribe (start_sample, samples) windows and yield results in order
+
+    Up to `parallelism` windows are in flight at once. Windows are pulled
+    lazily, so a window source that is still downloading overlaps with
+    transcription of earlier windows. Segment timestamps in each yielded
+    result are shifted onto the timeline of the full recording.
+
+    Args:
+        windows: Iterable of (start_sample, samples) at 16 kHz
+        options: Whisper decode options
+        submit: Callable that queues (samples, options) and returns a Future of a Whisper result
+        parallelism: Maximum number of windows in flight
+    """
+    windows = iter(windows)
+    in_flight = deque()
+    exhausted = False
+    while True:
+        # Hand back finished results first; block on the oldest one only when
+        # the pipeline is full or there is nothing left to submit
+        while in_flight and (exhausted or len(in_flight) >= parallelism or in_flight[0][1].done()):
+            start, future = in_flight.popleft()
+            result = future.result()
+            offset = start / SAMPLE_RATE
+            yield {
+                "text": result["text"],
+                "language": result["language"],
+                "segments": [
+                    {"start": segment["start"] + offset, "end": segment["end"] + offset, "text": segment["text"]}
+                    for segment in result["segments"]
+                ]
+            }
+        if exhausted:
+            return
+
+        window = next(windows, None)
+        if window is None:
+            exhausted = True
+            continue
+        start, samples = window
+        in_flight.append((start, submit(samples, options)))
+
+def iter_chunked_transcription(
+    audio_path: str,
+    options: dict,
+    submit: Callable[["np.ndarray", dict], Future],
+    chunk_seconds: float = CHUNK_SECONDS,
+    parallelism: int = CHUNK_PARALLELISM
+) -> Iterator[dict]:
+    """
+    Decode an audio file, split it at silences and yield chunk results in order
+
+    See transcribe_windows for how chunks are scheduled and timestamps shifted.
+    """
+    from whisper.audio import load_audio
+
+    audio = load_audio(audio_path)
+    chunks = find_chunk_boundaries(audio, chunk_seconds)
+    logger.info(f"Transcribing {audio_path} in {len(chunks)} chunks (parallelism {parallelism})")
+
+    windows = ((start, audio[start:end]) for start, end in chunks)
+    yield from transcribe_windows(windows, options, submit, parallelism)
+
+def transcribe_chunked(
+    audio_path: str,
+    model_name: str,
+    options: dict,
+    chunk_seconds: float = CHUNK_SECONDS,
+    parallelism: int = CHUNK_PARALLELISM,
+    backend: Optional[str] = None
+) -> dict:
+    """
+    Transcribe audio by splitting it at silences and running chunks in parallel
+
+    Chunks run on the Whisper worker pool (started with `parallelism` workers
+    if not already running), with the given transcription backend.
+
+    Returns:
+        Dict with text, language and segments, like a regular Whisper result
+    """
+    pool = get_worker_pool(model_name, workers=parallelism)
+    submit = functools.partial(pool.submit, backend=backend)
+    return merge_transcriptions(
+        iter_chunked_transcription(audio_path, options, submit, chunk_seconds, parallelism)
+    )
+
+def merge_transcriptions(results: Iterable[dict]) -> dict:
+    """Combine in-order chunk results into one Whisper-style result"""
+    results = list(results)
+    # Chunks may disagree on auto-detected language; keep the most common one
+    languages = Counter(result["language"] for result in results if result["language"])
+    return {
+        "text": "".join(result["text"] for result in results),
+        "language": languages.most_common(1)[0][0] if languages else None,
+        "segments": [segment for result in results for segment in result["segments"]]
+    }
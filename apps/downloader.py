@@ -0,0 +1,139 @@
+"""
+Parallel byte-range downloader for audio streams
+"""
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Set
+
+from apps.http_pool import get_http_session
+
+logger = logging.getLogger(__name__)
+
+# Number of ranges fetched at the same time for one download; 1 disables the
+# parallel downloader and uses pytube's sequential download
+DOWNLOAD_PARALLELISM = int(os.environ.get('DOWNLOAD_PARALLELISM', '4'))
+DOWNLOAD_CHUNK_BYTES = int(os.environ.get('DOWNLOAD_CHUNK_BYTES', str(2 * 1024 * 1024)))
+DOWNLOAD_MAX_RETRIES = int(os.environ.get('DOWNLOAD_MAX_RETRIES', '3'))
+# Global bandwidth cap across all downloads in this process; 0 means unlimited
+DOWNLOAD_MAX_BYTES_PER_SEC = int(os.environ.get('DOWNLOAD_MAX_BYTES_PER_SEC', '0'))
+
+READ_BLOCK_BYTES = 64 * 1024
+
+class BandwidthLimiter:
+    """Token bucket shared by every download thread"""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._allowance = float(rate)
+        self._last = time.monotonic()
+
+    def consume(self, amount: int):
+        """Account for `amount` bytes, sleeping if the cap has been exceeded"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= amount
+            delay = -self._allowance / self.rate if self._allowance < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+BANDWIDTH_LIMITER = BandwidthLimiter(DOWNLOAD_MAX_BYTES_PER_SEC)
+
+def split_ranges(total_size: int, chunk_bytes: int = DOWNLOAD_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """Split a file size into inclusive (start, end) byte ranges"""
+    return [(start, min(start + chunk_bytes, total_size) - 1) for start in range(0, total_size, chunk_bytes)]
+
+def _load_progress(progress_path: str, total_size: int, chunk_bytes: int) -> Set[int]:
+    """Read the set of completed range indexes left by an interrupted download"""
+    try:
+        with open(progress_path) as f:
+            progress = json.load(f)
+        if progress.get("total_size") == total_size and progress.get("chunk_bytes") == chunk_bytes:
+            return set(progress.get("completed", []))
+    except (OSError, ValueError):
+        pass
+    return set()
+
+def _fetch_range(url: str, part_path: str, start: int, end: int, max_retries: int):
+    """Download one byte range into its place in the part file, retrying on failure"""
+    session = get_http_session()
+    separator = "&" if "?" in url else "?"
+    for attempt in range(max_retries + 1):
+        try:
+            # Same range query parameter pytube uses for googlevideo URLs
+            with session.get(f"{url}{separator}range={start}-{end}", stream=True) as response:
+                response.raise_for_status()
+                position = start
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for block in response.iter_content(READ_BLOCK_BYTES):
+                        BANDWIDTH_LIMITER.consume(len(block))
+                        f.write(block)
+                        position += len(block)
+            if position != end + 1:
+                raise IOError(f"Short read for range {start}-{end}: got {position - start} bytes")
+            return
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            logger.warning(f"Range {start}-{end} attempt {attempt+1} failed: {str(e)}")
+            time.sleep(0.5 * (2 ** attempt))
+
+def download_ranges(
+    url: str,
+    output_path: str,
+    total_size: int,
+    parallelism: int = DOWNLOAD_PARALLELISM,
+    chunk_bytes: int = DOWNLOAD_CHUNK_BYTES,
+    max_retries: int = DOWNLOAD_MAX_RETRIES
+) -> str:
+    """
+    Download a URL in parallel byte ranges
+
+    Data goes to `output_path + ".part"` with completed ranges recorded in a
+    sidecar file, so an interrupted download resumes where it stopped. The
+    part file is renamed to output_path once every range has arrived.
+
+    Returns:
+        output_path
+    """
+    part_path = f"{output_path}.part"
+    progress_path = f"{output_path}.ranges"
+    ranges = split_ranges(total_size, chunk_bytes)
+
+    completed = _load_progress(progress_path, total_size, chunk_bytes) if os.path.exists(part_path) else set()
+    if not completed:
+        with open(part_path, "wb") as f:
+            f.truncate(total_size)
+    else:
+        logger.info(f"Resuming {output_path}: {len(completed)}/{len(ranges)} ranges already downloaded")
+
+    lock = threading.Lock()
+
+    def fetch(index: int):
+        start, end = ranges[index]
+        _fetch_range(url, part_path, start, end, max_retries)
+        with lock:
+            completed.add(index)
+            with open(progress_path, "w") as f:
+                json.dump({"total_size": total_size, "chunk_bytes": chunk_bytes, "completed": sorted(completed)}, f)
+
+    pending = [index for index in range(len(ranges)) if index not in completed]
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="range-download") as executor:
+        # list() re-raises the first range that ran out of retries
+        list(executor.map(fetch, pending))
+
+    os.replace(part_path, output_path)
+    try:
+        os.remove(progress_path)
+    except OSError:
+        pass
+    return output_path
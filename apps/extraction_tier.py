@@ -0,0 +1,151 @@
+"""
+Client for a separate extraction tier, used by caption-only (lite) servers
+"""
+import os
+import time
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+from apps.http_pool import get_http_session
+from apps.tracing import current_trace, format_breakdown, REQUEST_ID_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Base URL of a full server (with Whisper) that runs extraction jobs for lite servers
+EXTRACTION_TIER_URL = os.environ.get('EXTRACTION_TIER_URL', '').rstrip('/')
+# Longest a forwarded extraction is waited for, in seconds
+EXTRACTION_TIER_TIMEOUT = float(os.environ.get('EXTRACTION_TIER_TIMEOUT', '1800'))
+# Seconds between job status checks while waiting
+EXTRACTION_TIER_POLL_INTERVAL = float(os.environ.get('EXTRACTION_TIER_POLL_INTERVAL', '2'))
+
+EXTRACTION_TIER = None  # Created lazily by get_extraction_tier
+_tier_lock = threading.Lock()
+
+class RemoteJob:
+    """An extraction job running on the extraction tier, as last reported by its /jobs API"""
+
+    remote = True
+
+    def __init__(self, payload: dict):
+        self.update(payload)
+
+    def update(self, payload: dict):
+        self.payload = payload
+        self.id = payload.get("job_id")
+        self.video_id = payload.get("video_id")
+        self.language = payload.get("language")
+        self.model = payload.get("model")
+        self.backend = payload.get("backend")
+        self.status = payload.get("status", "failed")
+        self.progress = payload.get("progress") or {"step": 0, "total": 3, "message": self.status.capitalize()}
+        self.result = payload.get("result")
+        self.error = payload.get("error")
+        self.request_id = payload.get("request_id")
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> dict:
+        """Serialize the job for API responses (the tier's own representation)"""
+        return dict(self.payload)
+
+    def timing_summary(self) -> str:
+        """Stage breakdown reported by the tier"""
+        return format_breakdown(self.payload.get("timings") or [])
+
+def _failed(video_id: Optional[str], error: str, job_id: Optional[str] = None) -> RemoteJob:
+    return RemoteJob({"job_id": job_id, "video_id": video_id, "status": "failed", "error": error})
+
+class ExtractionTier:
+    """
+    Forwards extraction jobs to a full server's /jobs API
+
+    Has the same submit/get/cancel interface as JobManager, so lite servers
+    can hand out the tier's job IDs and proxy polling to it. The caller's
+    request ID is passed along, so the tier records the job's stage timings
+    under it.
+    """
+
+    def __init__(self, url: str, timeout: float = EXTRACTION_TIER_TIMEOUT,
+                 poll_interval: float = EXTRACTION_TIER_POLL_INTERVAL):
+        self.url = url
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def _call(self, method: str, path: str, **kwargs) -> Tuple[Optional[int], dict, Optional[str]]:
+        """Call the tier's jobs API; returns (status_code, payload, transport_error)"""
+        trace = current_trace()
+        headers = {REQUEST_ID_HEADER: trace.request_id} if trace else {}
+        try:
+            response = get_http_session().request(method, f"{self.url}{path}", headers=headers, **kwargs)
+        except Exception as e:
+            logger.error(f"Extraction tier request {method} {path} failed: {str(e)}")
+            return None, {}, f"Extraction tier unavailable: {str(e)}"
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        return response.status_code, payload, None
+
+    def _job(self, status_code: Optional[int], payload: dict, error: Optional[str],
+             job_id: Optional[str] = None, video_id: Optional[str] = None) -> Optional[RemoteJob]:
+        """Build a RemoteJob from a _call result; None when the tier doesn't know the job"""
+        if error:
+            return _failed(video_id, error, job_id)
+        if status_code == 404 and job_id:
+            return None
+        if status_code >= 400 or "job_id" not in payload:
+            return _failed(video_id, f"Extraction tier error: {payload.get('error') or f'HTTP {status_code}'}", job_id)
+        return RemoteJob(payload)
+
+    def submit(self, video_id: str, language: Optional[str] = None, backend: Optional[str] = None) -> RemoteJob:
+        """Queue an extraction on the tier, or join the tier's existing job for the same video"""
+        response = self._call("POST", "/jobs", json={"video_id": video_id, "language": language, "backend": backend})
+        job = self._job(*response, video_id=video_id)
+        logger.info(f"Forwarded extraction of video ID {video_id} to {self.url} (job {job.id}, {job.status})")
+        return job
+
+    def get(self, job_id: str) -> Optional[RemoteJob]:
+        """Current state of a tier job"""
+        return self._job(*self._call("GET", f"/jobs/{job_id}"), job_id=job_id)
+
+    def cancel(self, job_id: str) -> Optional[RemoteJob]:
+        """Cancel a tier job"""
+        return self._job(*self._call("DELETE", f"/jobs/{job_id}"), job_id=job_id)
+
+    def refresh(self, job: RemoteJob):
+        """Update job from the tier; transport errors keep the last known state so polling can retry"""
+        status_code, payload, error = self._call("GET", f"/jobs/{job.id}")
+        if error:
+            return
+        latest = self._job(status_code, payload, None, job.id, job.video_id)
+        if latest is None:
+            latest = _failed(job.video_id, f"Extraction tier lost job {job.id}", job.id)
+        job.update(latest.payload)
+
+    def wait(self, job: RemoteJob, progress: Optional[Callable[[int, int, str], None]] = None) -> RemoteJob:
+        """Poll a tier job until it finishes or the timeout passes, reporting progress as it changes"""
+        deadline = time.monotonic() + self.timeout
+        last_progress = None
+        while not job.done:
+            if progress and job.progress != last_progress:
+                last_progress = dict(job.progress)
+                progress(last_progress["step"], last_progress["total"], last_progress["message"])
+            if time.monotonic() >= deadline:
+                job.update(dict(job.payload, status="failed",
+                                error=f"Extraction job {job.id} did not finish within {self.timeout:.0f} seconds"))
+                break
+            time.sleep(self.poll_interval)
+            self.refresh(job)
+        return job
+
+def get_extraction_tier() -> Optional[ExtractionTier]:
+    """Get the shared extraction tier client, or None when EXTRACTION_TIER_URL is not set"""
+    global EXTRACTION_TIER
+    if EXTRACTION_TIER is None and EXTRACTION_TIER_URL:
+        with _tier_lock:
+            if EXTRACTION_TIER is None:
+                EXTRACTION_TIER = ExtractionTier(EXTRACTION_TIER_URL)
+    return EXTRACTION_TIER
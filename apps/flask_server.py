@@ -1,16 +1,21 @@
 """
 Flask server for YouTube transcript API
 """
+import json
 import logging
-from flask import Flask, request, jsonify
-
-from youtube_transcript_api import YouTubeTranscriptApi
-from langdetect import detect
+from flask import Flask, Response, request, jsonify, stream_with_context, g
 
 from apps.utils import (
-    clean_temp_files, download_audio, transcribe_audio, 
-    get_language_preference, get_video_info
+    start_temp_janitor, get_janitor_usage, get_video_info, get_youtube_transcript, 
+    extract_audio_transcript, get_transcript_cache, stream_transcript, run_batch, extract_video_id,
+    AUDIO_DOWNLOAD_ERROR, EXTRACTION_DISABLED_ERROR, BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_MAX_SIZE,
+    METRICS, SERVER_MODE, resolve_backend
 )
+from apps.jobs import get_job_manager
+from apps.warmup import warmup_status, start_warmup, PRELOAD_MODELS
+from apps.http_pool import http_stats
+from apps.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from apps.tracing import Trace, activate_trace, deactivate_trace, REQUEST_ID_HEADER
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +23,33 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# Old temporary files are cleaned up in the background, not per request
+start_temp_janitor()
+
+@app.before_request
+def begin_trace():
+    """Trace each request under the caller's X-Request-ID, or a new one"""
+    g.trace = Trace(request.headers.get(REQUEST_ID_HEADER))
+    g.trace_token = activate_trace(g.trace)
+
+@app.after_request
+def add_trace_headers(response):
+    """Report the per-stage breakdown in a Server-Timing header"""
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers[REQUEST_ID_HEADER] = trace.request_id
+        response.headers['Server-Timing'] = trace.server_timing()
+        if not response.is_streamed and trace.breakdown():
+            logger.info(f"[{trace.request_id}] {request.method} {request.path} {response.status_code}: {trace.summary()}")
+    return response
+
+@app.teardown_request
+def end_trace(exc):
+    """Restore the trace context once the request is finished"""
+    token = g.pop('trace_token', None)
+    if token is not None:
+        deactivate_trace(token)
+
 @app.route('/transcript', methods=['GET'])
 def get_transcript():
     """API endpoint to get transcript for a YouTube video"""
@@ -27,126 +59,45 @@ def get_transcript():
     
     if not video_id:
         return jsonify({"error": "Missing video_id parameter"}), 400
-    
-    # Clean old temporary files
-    clean_temp_files()
+    backend, backend_error = resolve_backend(request.args.get('backend'))
+    if backend_error:
+        return jsonify({"error": backend_error}), 400
     
     transcript_text = None
     transcript_language = None
     transcript_source = "youtube_api"
     error_msg = None
     
-    # Try to get transcript directly from YouTube if not forcing extraction
+    # Try to get transcript directly from YouTube (or the cache) if not forcing extraction
     if not force_extract:
-        try:
-            # Get language preference order
-            lang_preference = get_language_preference(language)
-            
-            # Try to get transcript in preferred languages
-            for lang in lang_preference:
-                try:
-                    transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
-                    transcript_text = "\n".join(line['text'] for line in transcript_list)
-                    
-                    # Check if transcript is too short or contains placeholder text
-                    if len(transcript_text) < 50 or "caption is updating" in transcript_text.lower():
-                        logger.info(f"Retrieved {lang} transcript is too short or contains placeholder text, treating as no transcript")
-                        transcript_text = None
-                        continue
-                        
-                    transcript_language = lang
-                    logger.info(f"Retrieved {lang} transcript from YouTube API")
-                    break
-                except Exception as lang_e:
-                    logger.info(f"No {lang} transcript available: {str(lang_e)}")
-                    continue
-            
-            # If no specific language found, try with auto-generated
-            if not transcript_text:
-                try:
-                    transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                    transcript_text = "\n".join(line['text'] for line in transcript_list)
-                    
-                    # Check if transcript is too short or contains placeholder text
-                    if transcript_text and (len(transcript_text) < 50 or "caption is updating" in transcript_text.lower()):
-                        logger.info("Retrieved auto transcript is too short or contains placeholder text, treating as no transcript")
-                        transcript_text = None
-                    # Try to detect language
-                    elif transcript_text:
-                        try:
-                            transcript_language = detect(transcript_text[:100])
-                        except:
-                            transcript_language = "unknown"
-                        logger.info("Retrieved transcript from YouTube API (auto language)")
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.warning(f"Failed to get transcript from YouTube API: {error_msg}")
-        except Exception as e:
-            error_msg = str(e)
+        transcript_text, transcript_language, transcript_source, error_msg = get_youtube_transcript(
+            video_id, language
+        )
+        if error_msg:
             logger.warning(f"Failed to get transcript from YouTube API: {error_msg}")
     
     # If transcript not found or forcing extraction, try manual extraction
-    if not transcript_text or force_extract:
+    if not transcript_text:
         logger.info("Attempting manual audio extraction and transcription")
-        transcript_source = "whisper_extraction"
+        transcript_text, transcript_language, transcript_source, extract_error = extract_audio_transcript(
+            video_id, language, backend=backend
+        )
         
-        # Download audio - changed from async to sync
-        audio_path, dl_error = download_audio(video_id)
-        if dl_error:
-            logger.error(f"Audio download error: {dl_error}")
-            error_detail = f"{error_msg}. Audio download error: {dl_error}" if error_msg else f"Audio download error: {dl_error}"
-            return jsonify({
-                "error": f"Failed to get transcript: {error_detail}",
-                "video_id": video_id,
-                "transcript": "No transcript available for this video.",
-                "status": "error"
-            }), 404  # Use 404 to indicate the resource (transcript) couldn't be found
-        
-        # Transcribe with Whisper
-        if audio_path:
-            try:
-                # If language is specified, use it for transcription
-                whisper_lang = None
-                if language:
-                    if language.lower() in ['en', 'english']:
-                        whisper_lang = 'en'
-                    elif language.lower() in ['vi', 'vietnamese']:
-                        whisper_lang = 'vi'
-                
-                # Changed from async to sync
-                transcript_text, transcribe_error = transcribe_audio(audio_path, whisper_lang)
-                
-                # Try to detect language if not specified
-                if transcript_text and not whisper_lang:
-                    try:
-                        transcript_language = detect(transcript_text[:100])
-                    except:
-                        transcript_language = "unknown"
-                else:
-                    transcript_language = whisper_lang
-                
-                # Clean up the audio file
-                try:
-                    import os
-                    os.remove(audio_path)
-                except:
-                    pass
-                
-                if transcribe_error:
-                    return jsonify({
-                        "error": f"Failed to get transcript: {error_msg}. Transcription error: {transcribe_error}"
-                    }), 500
-            except Exception as e:
-                # Clean up the audio file
-                try:
-                    import os
-                    os.remove(audio_path)
-                except:
-                    pass
-                
+        if extract_error:
+            error_detail = f"{error_msg}. {extract_error}" if error_msg else extract_error
+            if extract_error.startswith(AUDIO_DOWNLOAD_ERROR):
                 return jsonify({
-                    "error": f"Failed to transcribe audio: {str(e)}"
-                }), 500
+                    "error": f"Failed to get transcript: {error_detail}",
+                    "video_id": video_id,
+                    "transcript": "No transcript available for this video.",
+                    "status": "error"
+                }), 404  # Use 404 to indicate the resource (transcript) couldn't be found
+            if extract_error == EXTRACTION_DISABLED_ERROR:
+                return jsonify({"error": f"Failed to get transcript: {error_detail}"}), 503
+            
+            return jsonify({
+                "error": f"Failed to get transcript: {error_detail}"
+            }), 500
     
     if not transcript_text:
         logger.error(f"No transcript available for video ID: {video_id}. Error: {error_msg or 'Unknown error'}")
@@ -157,12 +108,38 @@ def get_transcript():
             "status": "error"
         }), 404  # Use 404 to indicate the resource (transcript) couldn't be found
     
-    return jsonify({
+    response = {
         "video_id": video_id,
         "transcript": transcript_text,
         "language": transcript_language,
         "source": transcript_source
-    })
+    }
+    if transcript_source == "whisper_extraction":
+        response["backend"] = backend
+    return jsonify(response)
+
+@app.route('/transcript/stream', methods=['GET'])
+def stream_transcript_events():
+    """Stream transcript segments as Server-Sent Events as they become available"""
+    video_id = request.args.get('video_id')
+    language = request.args.get('language')
+    force_extract = request.args.get('force_extract', 'false').lower() == 'true'
+    
+    if not video_id:
+        return jsonify({"error": "Missing video_id parameter"}), 400
+    backend, backend_error = resolve_backend(request.args.get('backend'))
+    if backend_error:
+        return jsonify({"error": backend_error}), 400
+    
+    def generate():
+        for event, data in stream_transcript(video_id, language, force_extract, backend):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route('/video/info', methods=['GET'])
 def video_info():
@@ -178,7 +155,169 @@ def video_info():
     
     return jsonify(info)
 
+def parse_batch_request():
+    """Read video IDs and concurrency from a batch request; returns (video_ids, concurrency, error_response)"""
+    payload = request.get_json(silent=True) or {}
+    video_ids = payload.get('video_ids')
+    
+    if not isinstance(video_ids, list) or not video_ids:
+        return None, None, (jsonify({"error": "Missing video_ids list in JSON body"}), 400)
+    if len(video_ids) > BATCH_MAX_SIZE:
+        return None, None, (jsonify({"error": f"Too many video IDs (max {BATCH_MAX_SIZE})"}), 400)
+    
+    try:
+        concurrency = int(payload.get('concurrency', BATCH_CONCURRENCY))
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"error": "concurrency must be an integer"}), 400)
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    
+    # Accept URLs as well as IDs, and fetch each video once
+    video_ids = list(dict.fromkeys(extract_video_id(str(video_id)) for video_id in video_ids))
+    return video_ids, concurrency, None
+
+def ndjson_response(results):
+    """Stream (video_id, record) pairs as newline-delimited JSON"""
+    def generate():
+        for _, record in results:
+            yield json.dumps(record) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/batch/transcripts', methods=['POST'])
+def batch_transcripts():
+    """Fetch transcripts for many videos concurrently, streamed as NDJSON in completion order"""
+    video_ids, concurrency, error_response = parse_batch_request()
+    if error_response:
+        return error_response
+    
+    payload = request.get_json(silent=True) or {}
+    language = payload.get('language')
+    fallback_extract = bool(payload.get('fallback_extract', False))
+    backend, backend_error = resolve_backend(payload.get('backend'))
+    if backend_error:
+        return jsonify({"error": backend_error}), 400
+    
+    def fetch(video_id):
+        try:
+            transcript_text, transcript_language, transcript_source, error_msg = get_youtube_transcript(
+                video_id, language
+            )
+            if not transcript_text and fallback_extract:
+                transcript_text, transcript_language, transcript_source, error_msg = extract_audio_transcript(
+                    video_id, language, backend=backend
+                )
+        except Exception as e:
+            transcript_text, error_msg = None, str(e)
+        
+        if not transcript_text:
+            return {"video_id": video_id, "status": "error", "error": error_msg or "Unknown error"}
+        return {
+            "video_id": video_id,
+            "transcript": transcript_text,
+            "language": transcript_language,
+            "source": transcript_source
+        }
+    
+    return ndjson_response(run_batch(fetch, video_ids, concurrency))
+
+@app.route('/batch/video-info', methods=['POST'])
+def batch_video_info():
+    """Fetch video information for many videos concurrently, streamed as NDJSON in completion order"""
+    video_ids, concurrency, error_response = parse_batch_request()
+    if error_response:
+        return error_response
+    
+    def fetch(video_id):
+        info, error = get_video_info(video_id)
+        if error:
+            return {"video_id": video_id, "status": "error", "error": error}
+        return {"video_id": video_id, **info}
+    
+    return ndjson_response(run_batch(fetch, video_ids, concurrency))
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Submit an audio extraction job; returns the existing job for the same video, language and model"""
+    payload = request.get_json(silent=True) or {}
+    video_id = payload.get('video_id') or request.args.get('video_id')
+    language = payload.get('language') or request.args.get('language')
+    
+    if not video_id:
+        return jsonify({"error": "Missing video_id parameter"}), 400
+    backend, backend_error = resolve_backend(payload.get('backend') or request.args.get('backend'))
+    if backend_error:
+        return jsonify({"error": backend_error}), 400
+    
+    manager = get_job_manager()
+    if manager is None:
+        return jsonify({"error": EXTRACTION_DISABLED_ERROR}), 503
+    
+    job = manager.submit(video_id, language, backend)
+    # Only a forwarded job can fail on submission (the extraction tier is unreachable)
+    status_code = 200 if job.status == "completed" else 502 if job.status == "failed" else 202
+    return jsonify(job.to_dict()), status_code
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Get status, progress and (once completed) the result of an extraction job"""
+    manager = get_job_manager()
+    if manager is None:
+        return jsonify({"error": EXTRACTION_DISABLED_ERROR}), 503
+    
+    job = manager.get(job_id)
+    if not job:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel an extraction job"""
+    manager = get_job_manager()
+    if manager is None:
+        return jsonify({"error": EXTRACTION_DISABLED_ERROR}), 503
+    
+    job = manager.cancel(job_id)
+    if not job:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+    
+    return jsonify(job.to_dict())
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy"}), 200
\ No newline at end of file
+    return jsonify({"status": "healthy", "mode": SERVER_MODE}), 200
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint; 503 until startup warmup (PRELOAD_MODELS) has succeeded, with its error if it failed"""
+    status = warmup_status()
+    if PRELOAD_MODELS and status["status"] == "idle":
+        # Served without server.py (e.g. by a WSGI server): warm up on the first readiness probe
+        start_warmup()
+        status = warmup_status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report transcript cache hit/miss counters and size"""
+    cache = get_transcript_cache()
+    if cache is None:
+        return jsonify({"enabled": False}), 200
+    
+    return jsonify({"enabled": True, **cache.stats()}), 200
+
+@app.route('/temp/stats', methods=['GET'])
+def temp_stats():
+    """Report disk usage of the temporary download directory"""
+    return jsonify(get_janitor_usage()), 200
+
+@app.route('/http/stats', methods=['GET'])
+def connection_stats():
+    """Report outbound request counts and connection reuse for the shared HTTP pool"""
+    return jsonify(http_stats()), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Per-stage latency histograms and counters in the Prometheus text format"""
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
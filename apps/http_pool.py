@@ -0,0 +1,179 @@
+"""
+Shared keep-alive HTTP connection pool for outbound YouTube traffic
+"""
+import os
+import json
+import socket
+import logging
+import threading
+import urllib.error
+from urllib.parse import urlsplit, urlunsplit
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Connections kept open per host, and how many hosts get their own pool
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '16'))
+HTTP_POOL_HOSTS = int(os.environ.get('HTTP_POOL_HOSTS', '8'))
+# Default (connect, read) timeouts in seconds for calls that don't set one
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '30'))
+# Send YouTube and googlevideo requests to this base URL instead, e.g. a local
+# stand-in for offline benchmarks (tests/fake_youtube.py)
+YOUTUBE_UPSTREAM_URL = os.environ.get('YOUTUBE_UPSTREAM_URL', '').rstrip('/')
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com'}
+
+SESSION = None  # Created lazily on first use
+_session_lock = threading.Lock()
+
+class ConnectionStats:
+    """Counts requests and newly opened connections per host"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _host(self, host: str) -> dict:
+        return self._hosts.setdefault(host, {"requests": 0, "connections": 0})
+
+    def record_request(self, host: str):
+        with self._lock:
+            self._host(host)["requests"] += 1
+
+    def record_connection(self, host: str):
+        with self._lock:
+            self._host(host)["connections"] += 1
+
+    def snapshot(self) -> dict:
+        """Return totals and per-host counts, including how many requests reused a connection"""
+        with self._lock:
+            hosts = {host: dict(counts) for host, counts in self._hosts.items()}
+        for counts in hosts.values():
+            counts["reused"] = max(counts["requests"] - counts["connections"], 0)
+        requests_total = sum(c["requests"] for c in hosts.values())
+        connections_total = sum(c["connections"] for c in hosts.values())
+        reused = max(requests_total - connections_total, 0)
+        return {
+            "requests": requests_total,
+            "connections_opened": connections_total,
+            "reused": reused,
+            "reuse_ratio": reused / requests_total if requests_total else 0.0,
+            "hosts": hosts
+        }
+
+HTTP_STATS = ConnectionStats()
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        HTTP_STATS.record_connection(self.host)
+        return super()._new_conn()
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        HTTP_STATS.record_connection(self.host)
+        return super()._new_conn()
+
+def redirect_upstream(url: str, upstream: str = YOUTUBE_UPSTREAM_URL) -> str:
+    """Rewrite a YouTube or googlevideo URL onto the configured upstream, keeping path and query"""
+    if not upstream:
+        return url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host not in YOUTUBE_HOSTS and not host.endswith(".googlevideo.com"):
+        return url
+    target = urlsplit(upstream)
+    return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with default timeouts and connection/reuse accounting"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        request.url = redirect_upstream(request.url)
+        HTTP_STATS.record_request(requests.utils.urlparse(request.url).hostname or "")
+        return super().send(request, **kwargs)
+
+def get_http_session() -> requests.Session:
+    """Get or create the shared keep-alive session"""
+    global SESSION
+    if SESSION is None:
+        with _session_lock:
+            if SESSION is None:
+                session = requests.Session()
+                adapter = PooledAdapter(
+                    pool_connections=HTTP_POOL_HOSTS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    pool_block=True
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                SESSION = session
+    return SESSION
+
+def http_stats() -> dict:
+    """Connection reuse statistics for the shared session"""
+    return HTTP_STATS.snapshot()
+
+class _UrlopenResponse:
+    """Minimal urlopen-style wrapper around a streamed requests response, as pytube expects"""
+
+    def __init__(self, response: requests.Response):
+        self._response = response
+        self.status = response.status_code
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._response.raw.read(amt, decode_content=True) or b""
+
+    def info(self):
+        return self._response.headers
+
+    def getcode(self) -> int:
+        return self.status
+
+    def close(self):
+        self._response.close()
+
+def _pytube_execute_request(url, method=None, headers=None, data=None, timeout=None):
+    """Drop-in replacement for pytube.request._execute_request that uses the shared session"""
+    base_headers = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+    if headers:
+        base_headers.update(headers)
+    if data and not isinstance(data, bytes):
+        data = json.dumps(data).encode("utf8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+    if not isinstance(timeout, (int, float)):
+        timeout = None  # pytube passes socket._GLOBAL_DEFAULT_TIMEOUT; use the pool default
+
+    try:
+        response = get_http_session().request(
+            method or "GET", url, headers=base_headers, data=data, timeout=timeout, stream=True
+        )
+    except requests.Timeout as e:
+        # pytube retries on URLError(socket.timeout)
+        raise urllib.error.URLError(socket.timeout(str(e)))
+    except requests.ConnectionError as e:
+        raise urllib.error.URLError(str(e))
+
+    if response.status_code >= 400:
+        response.close()
+        raise urllib.error.HTTPError(url, response.status_code, response.reason, response.headers, None)
+    return _UrlopenResponse(response)
+
+def install_pytube_session():
+    """Route pytube's urllib requests through the shared session"""
+    import pytube.request
+    if pytube.request._execute_request is not _pytube_execute_request:
+        pytube.request._execute_request = _pytube_execute_request
@@ -0,0 +1,204 @@
+"""
+Background janitor for the temporary download directory
+"""
+import os
+import time
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Files older than this (by last use) are removed, in seconds
+TEMP_MAX_AGE = int(os.environ.get('TEMP_MAX_AGE', '3600'))
+# Total size budget for the directory; least recently used files go first
+TEMP_MAX_BYTES = int(os.environ.get('TEMP_MAX_MB', '2048')) * 1024 * 1024
+# Seconds between background sweeps
+JANITOR_INTERVAL = int(os.environ.get('JANITOR_INTERVAL', '60'))
+
+JANITOR = None  # Created lazily by get_janitor
+_janitor_lock = threading.Lock()
+
+class TempJanitor:
+    """
+    Keeps an index of files in a directory and enforces age and size limits
+
+    Top-level files, staged partial downloads (partial/) and job workspaces
+    (work/<id>, counted by their total size) all count against the budget.
+    Sweeps run on a daemon thread, so request handlers never list the
+    directory. Paths that are pinned by an active job (including their
+    .part/.ranges siblings) are never deleted.
+    """
+
+    def __init__(self, directory: str, max_age: float = TEMP_MAX_AGE,
+                 max_bytes: int = TEMP_MAX_BYTES, interval: float = JANITOR_INTERVAL):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = {}  # path -> {"size", "last_used", "is_dir"}
+        self._pins: Dict[str, int] = {}
+        self._removed = 0
+        self._last_sweep = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background sweep thread (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="temp-janitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background sweep thread"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Temp janitor sweep failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def pin(self, path: str):
+        """Mark a path as in use so it is never deleted"""
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+
+    def unpin(self, path: str):
+        """Release a pin taken with pin()"""
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+            if path in self._index:
+                self._index[path]["last_used"] = time.time()
+
+    @contextmanager
+    def in_use(self, path: str):
+        """Pin a path for the duration of a with-block"""
+        self.pin(path)
+        try:
+            yield path
+        finally:
+            self.unpin(path)
+
+    def _is_pinned(self, path: str) -> bool:
+        """Caller holds the lock"""
+        return any(path == pinned or path.startswith(pinned + ".") for pinned in self._pins)
+
+    @staticmethod
+    def _list(directory: str) -> list:
+        try:
+            return list(os.scandir(directory))
+        except FileNotFoundError:
+            return []
+
+    @classmethod
+    def _tree_usage(cls, path: str, mtime: float) -> Tuple[int, float]:
+        """Total size of the files under a directory and the newest mtime in it"""
+        size, newest = 0, mtime
+        for entry in cls._list(path):
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_size, sub_newest = cls._tree_usage(entry.path, entry.stat().st_mtime)
+                    size, newest = size + sub_size, max(newest, sub_newest)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    size, newest = size + stat.st_size, max(newest, stat.st_mtime)
+            except FileNotFoundError:
+                continue  # Removed by its job while we were looking
+        return size, newest
+
+    def _scan(self):
+        """Refresh the index from the directory (caller holds the lock)"""
+        seen = set()
+        entries = [(entry, False) for entry in self._list(self.directory) if entry.is_file()]
+        entries += [(entry, False) for entry in self._list(os.path.join(self.directory, "partial")) if entry.is_file()]
+        entries += [(entry, True) for entry in self._list(os.path.join(self.directory, "work")) if entry.is_dir()]
+        for entry, is_dir in entries:
+            try:
+                stat = entry.stat()
+                size, mtime = self._tree_usage(entry.path, stat.st_mtime) if is_dir else (stat.st_size, stat.st_mtime)
+            except FileNotFoundError:
+                continue
+            seen.add(entry.path)
+            known = self._index.get(entry.path)
+            if known is None:
+                self._index[entry.path] = {"size": size, "last_used": mtime, "is_dir": is_dir}
+            else:
+                known["size"] = size
+                known["last_used"] = max(known["last_used"], mtime)
+        for path in list(self._index):
+            if path not in seen:
+                del self._index[path]
+
+    def _remove(self, path: str) -> bool:
+        """Delete a file or workspace and drop it from the index (caller holds the lock)"""
+        is_dir = self._index.get(path, {}).get("is_dir", False)
+        try:
+            if is_dir:
+                shutil.rmtree(path)
+                logger.info(f"Removed stale workspace: {path}")
+            else:
+                os.remove(path)
+                logger.info(f"Removed temporary file: {path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error removing temporary {'workspace' if is_dir else 'file'} {path}: {str(e)}")
+            return False
+        self._index.pop(path, None)
+        self._removed += 1
+        return True
+
+    def sweep(self):
+        """Apply the age limit, then evict least recently used entries until under the size budget"""
+        with self._lock:
+            self._scan()
+            cutoff = time.time() - self.max_age
+            for path, info in list(self._index.items()):
+                if info["last_used"] < cutoff and not self._is_pinned(path):
+                    self._remove(path)
+
+            total = sum(info["size"] for info in self._index.values())
+            if total > self.max_bytes:
+                for path, info in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+                    if total <= self.max_bytes:
+                        break
+                    if not self._is_pinned(path) and self._remove(path):
+                        total -= info["size"]
+            self._last_sweep = time.time()
+
+    def usage(self) -> dict:
+        """Disk usage of the directory as of the last sweep"""
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "files": sum(1 for info in self._index.values() if not info["is_dir"]),
+                "workspaces": sum(1 for info in self._index.values() if info["is_dir"]),
+                "bytes": sum(info["size"] for info in self._index.values()),
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+                "pinned": len(self._pins),
+                "removed": self._removed,
+                "last_sweep": self._last_sweep
+            }
+
+def get_janitor(directory: Optional[str] = None) -> TempJanitor:
+    """Get or create the shared janitor for the temp directory"""
+    global JANITOR
+    if JANITOR is None:
+        with _janitor_lock:
+            if JANITOR is None:
+                JANITOR = TempJanitor(directory)
+    return JANITOR
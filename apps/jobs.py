@@ -0,0 +1,214 @@
+"""
+Background extraction jobs for long-running Whisper transcriptions
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Dict, Union
+
+from apps.utils import extract_audio_transcript, normalize_language, resolve_backend, WHISPER_MODEL_NAME, LITE_MODE
+from apps.extraction_tier import ExtractionTier, get_extraction_tier
+from apps.tracing import Trace, current_trace, activate_trace, deactivate_trace
+
+logger = logging.getLogger(__name__)
+
+# Number of extractions that run at the same time
+JOB_WORKERS = int(os.environ.get('EXTRACTION_JOB_WORKERS', '1'))
+# How long finished jobs (and their results) are kept for polling, in seconds
+JOB_RETENTION = int(os.environ.get('EXTRACTION_JOB_RETENTION', '3600'))
+
+JOB_MANAGER = None  # Created lazily on first use
+_manager_lock = threading.Lock()
+
+class Job:
+    """A queued or running audio extraction"""
+
+    def __init__(
+        self, 
+        video_id: str, 
+        language: Optional[str], 
+        model: str, 
+        request_id: Optional[str] = None, 
+        backend: Optional[str] = None
+    ):
+        self.id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.language = language
+        self.model = model
+        self.backend = backend
+        self.status = "queued"  # queued, running, completed, failed, cancelled
+        self.progress = {"step": 0, "total": 3, "message": "Queued"}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Stage timings of the extraction, under the submitting request's ID
+        self.trace = Trace(request_id or self.id)
+
+    # Jobs run in this process are always current; see extraction_tier.RemoteJob
+    remote = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    @property
+    def request_id(self) -> str:
+        return self.trace.request_id
+
+    def timing_summary(self) -> str:
+        """Stage breakdown of the extraction so far"""
+        return self.trace.summary()
+
+    def to_dict(self) -> dict:
+        """Serialize the job for API responses"""
+        return {
+            "job_id": self.id,
+            "video_id": self.video_id,
+            "language": self.language,
+            "model": self.model,
+            "backend": self.backend,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "request_id": self.trace.request_id,
+            "timings": self.trace.breakdown()
+        }
+
+class JobManager:
+    """
+    Runs extraction jobs on a bounded thread pool
+
+    Jobs are idempotent per (video_id, language, model, backend): submitting the same
+    extraction again returns the existing job while it is queued, running or
+    retained after completion.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: float = JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extraction-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[Tuple[str, str, str, str], str] = {}
+
+    def submit(self, video_id: str, language: Optional[str] = None, backend: Optional[str] = None) -> Job:
+        """Submit an extraction (backend already checked with resolve_backend), or return the existing job for the same key"""
+        backend, _ = resolve_backend(backend)
+        key = (video_id, normalize_language(language) or 'auto', WHISPER_MODEL_NAME, backend)
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing and existing.status not in ("failed", "cancelled"):
+                return existing
+
+            trace = current_trace()
+            job = Job(
+                video_id, normalize_language(language), WHISPER_MODEL_NAME, trace.request_id if trace else None, backend
+            )
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+
+        logger.info(f"Queued extraction job {job.id} for video ID {video_id}")
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job
+
+        Queued jobs never start. A running download or Whisper pass can't be
+        interrupted, so a running job is marked cancelled and its result dropped.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and not job.done:
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                logger.info(f"Cancelled extraction job {job_id}")
+            return job
+
+    def _run(self, job: Job):
+        """Worker body for a single job"""
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            job.status = "running"
+            job.started_at = time.time()
+
+        def on_progress(step: int, total: int, message: str):
+            job.progress = {"step": step, "total": total, "message": message}
+
+        token = activate_trace(job.trace)
+        try:
+            transcript_text, transcript_language, transcript_source, error_msg = extract_audio_transcript(
+                job.video_id, job.language, progress=on_progress, backend=job.backend
+            )
+        except Exception as e:
+            logger.error(f"Extraction job {job.id} crashed: {str(e)}")
+            transcript_text, error_msg = None, str(e)
+        finally:
+            deactivate_trace(token)
+        logger.info(f"[{job.trace.request_id}] Extraction job {job.id}: {job.trace.summary()}")
+
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            if error_msg:
+                job.status = "failed"
+                job.error = error_msg
+            else:
+                job.status = "completed"
+                job.progress = {"step": 3, "total": 3, "message": "Completed"}
+                job.result = {
+                    "video_id": job.video_id,
+                    "transcript": transcript_text,
+                    "language": transcript_language,
+                    "source": transcript_source,
+                    "backend": job.backend
+                }
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period (caller holds the lock)"""
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._by_key = {key: job_id for key, job_id in self._by_key.items() if job_id in self._jobs}
+
+    def stats(self) -> dict:
+        """Count jobs by status"""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
+
+def get_job_manager() -> Optional[Union[JobManager, ExtractionTier]]:
+    """
+    Get or create the shared job manager
+
+    Lite servers don't run extractions themselves: jobs go to the extraction
+    tier, or nowhere (None) when EXTRACTION_TIER_URL is not set.
+    """
+    if LITE_MODE:
+        return get_extraction_tier()
+    global JOB_MANAGER
+    if JOB_MANAGER is None:
+        with _manager_lock:
+            if JOB_MANAGER is None:
+                JOB_MANAGER = JobManager()
+    return JOB_MANAGER
@@ -1,46 +1,157 @@
 """
 MCP server for YouTube transcript API
 """
-import logging
-from typing import Optional
 import os
+import atexit
+import asyncio
+import logging
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Any
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
 from mcp.server.fastmcp import FastMCP, Context
-from youtube_transcript_api import YouTubeTranscriptApi
-from pytube import Search
-from langdetect import detect
-
 from apps.utils import (
-    clean_temp_files, download_audio, transcribe_audio, 
-    get_language_preference, get_video_info, extract_video_id, get_youtube_transcript
+    clean_temp_files, start_temp_janitor, start_whisper_workers, get_video_info, extract_video_id, 
+    get_youtube_transcript, search_videos, resolve_backend, AUDIO_DOWNLOAD_ERROR, EXTRACTION_DISABLED_ERROR, METRICS
 )
+from apps.jobs import get_job_manager
+from apps.metrics import start_metrics_server
+from apps.warmup import run_warmup, PRELOAD_MODELS
+from apps.tracing import start_trace
+
+# Seconds between job status checks while extract_transcript waits
+JOB_POLL_INTERVAL = 1.0
+
+# MCP talks over stdio, so metrics are served on a side port; 0 disables it
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9090'))
+
+# Blocking helpers (YouTube lookups and pytube calls) run on this
+# executor instead of the event loop. Each kind of work has its own limit so
+# a burst of one kind can't starve the others; Whisper extraction is bounded
+# separately by the job queue (EXTRACTION_JOB_WORKERS).
+MCP_WORKER_THREADS = int(os.environ.get('MCP_WORKER_THREADS', '16'))
+MCP_CONCURRENCY_LIMITS = {
+    "transcript": int(os.environ.get('MCP_TRANSCRIPT_CONCURRENCY', '8')),
+    "info": int(os.environ.get('MCP_INFO_CONCURRENCY', '4')),
+    "search": int(os.environ.get('MCP_SEARCH_CONCURRENCY', '2')),
+}
+EXECUTOR = ThreadPoolExecutor(max_workers=MCP_WORKER_THREADS, thread_name_prefix="mcp-blocking")
+_limits = {kind: asyncio.Semaphore(limit) for kind, limit in MCP_CONCURRENCY_LIMITS.items()}
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ThreadContext:
+    """
+    Stand-in for an MCP Context inside executor threads
+
+    Context's logging methods are coroutines, so blocking helpers can't call
+    them directly; this schedules each message on the event loop instead.
+    """
+
+    def __init__(self, ctx: Context, loop: asyncio.AbstractEventLoop):
+        self._ctx = ctx
+        self._loop = loop
+
+    def _send(self, level: str, message: str):
+        future = asyncio.run_coroutine_threadsafe(getattr(self._ctx, level)(message), self._loop)
+        future.add_done_callback(
+            lambda done: done.cancelled() or done.exception() is None
+            or logger.warning(f"Could not send MCP log message: {done.exception()}")
+        )
+
+    def debug(self, message: str):
+        self._send("debug", message)
+
+    def info(self, message: str):
+        self._send("info", message)
+
+    def warning(self, message: str):
+        self._send("warning", message)
+
+    def error(self, message: str):
+        self._send("error", message)
+
+async def run_blocking(kind: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking helper on the MCP executor, bounded by the concurrency limit for its kind"""
+    async with _limits[kind]:
+        loop = asyncio.get_running_loop()
+        # Blocking code logs to the client through the loop, never by calling Context directly
+        args = [ThreadContext(arg, loop) if isinstance(arg, Context) else arg for arg in args]
+        # Carry the current trace into the worker thread so its spans are recorded
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(EXECUTOR, functools.partial(context.run, fn, *args, **kwargs))
+
+def trace_tool(ctx: Optional[Context]):
+    """Start a trace for a tool call, tagged with the MCP request ID when there is one"""
+    try:
+        request_id = str(ctx.request_id) if ctx else None
+    except Exception:
+        request_id = None  # Called outside a request
+    return start_trace(request_id)
+
 class AppContext:
     """Context for the MCP server"""
     def __init__(self):
         self.model = None
 
+_resources_started = False
+_resources_lock = asyncio.Lock()
+
+async def start_process_resources():
+    """
+    Start the janitor, Whisper workers, warmup and metrics server once per process
+
+    The lifespan runs once per client session under the SSE transport, so
+    these process-wide services outlive sessions and are stopped at exit.
+    """
+    global _resources_started
+    async with _resources_lock:
+        if _resources_started:
+            return
+        
+        # Old temporary files are cleaned up in the background, not per request
+        janitor = start_temp_janitor()
+        
+        # Start Whisper worker processes and wait for their models to load
+        pool = await asyncio.to_thread(start_whisper_workers)
+        
+        # Optionally fetch the weights, run a dummy inference and load langdetect
+        # before taking requests, so no tool call pays for a cold start
+        if PRELOAD_MODELS:
+            await asyncio.to_thread(run_warmup)
+        
+        metrics_server = None
+        if METRICS_PORT:
+            try:
+                metrics_server = start_metrics_server(METRICS, METRICS_PORT)
+            except OSError as e:
+                logger.warning(f"Could not serve metrics on port {METRICS_PORT}: {str(e)}")
+        
+        atexit.register(stop_process_resources, janitor, pool, metrics_server)
+        _resources_started = True
+
+def stop_process_resources(janitor, pool, metrics_server):
+    """Stop the process-wide services (registered with atexit by start_process_resources)"""
+    logger.info("Shutting down YouTube Transcript MCP Server...")
+    if pool is not None:
+        pool.shutdown()
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    janitor.stop()
+    clean_temp_files()
+    EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
 @asynccontextmanager
 async def app_lifespan(server: FastMCP) -> AsyncIterator[AppContext]:
-    """Initialize and clean up resources"""
-    # Create our context object
-    context = AppContext()
-    
-    # Perform any initialization here
-    logger.info("Initializing YouTube Transcript MCP Server...")
-    
-    try:
-        yield context
-    finally:
-        # Clean up resources
-        clean_temp_files()
-        logger.info("Shutting down YouTube Transcript MCP Server...")
+    """Set up a client session, starting the process-wide services on the first one"""
+    logger.info("Initializing YouTube Transcript MCP Server session...")
+    await start_process_resources()
+    yield AppContext()
 
 # Create an MCP server
 mcp = FastMCP(
@@ -59,7 +170,7 @@ mcp = FastMCP(
 @mcp.resource("youtube://{video_id}/info")
 async def get_video_info_resource(video_id: str) -> str:
     """Get basic information about a YouTube video"""
-    info, error = get_video_info(video_id)
+    info, error = await run_blocking("info", get_video_info, video_id)
     if error:
         return f"Error retrieving video information: {error}"
     
@@ -77,8 +188,11 @@ async def get_transcript_resource(video_id: str) -> str:
     """Get transcript for a YouTube video as a resource"""
     logger.info(f"Resource request for transcript of video {video_id}")
     
-    # Remove await since get_youtube_transcript is now sync
-    transcript_text, transcript_language, _, error_msg = get_youtube_transcript(video_id)
+    # Run the sync helper off the event loop; concurrent requests for the
+    # same video are coalesced inside get_youtube_transcript
+    transcript_text, transcript_language, _, error_msg = await run_blocking(
+        "transcript", get_youtube_transcript, video_id
+    )
     
     if error_msg:
         return f"""# No transcript available
@@ -105,12 +219,16 @@ async def get_transcript(video_id: str, language: Optional[str] = None, ctx: Con
         ctx: Context for progress reporting
     """
     if ctx:
-        ctx.info(f"Getting transcript for video ID: {video_id}")
+        await ctx.info(f"Getting transcript for video ID: {video_id}")
     
-    # Remove await since get_youtube_transcript is now sync
-    transcript_text, transcript_language, transcript_source, error_msg = get_youtube_transcript(
-        video_id, language, ctx
-    )
+    # Run the sync helper off the event loop; concurrent requests for the
+    # same video are coalesced inside get_youtube_transcript
+    with trace_tool(ctx) as trace:
+        transcript_text, transcript_language, transcript_source, error_msg = await run_blocking(
+            "transcript", get_youtube_transcript, video_id, language, ctx
+        )
+    if ctx:
+        await ctx.info(f"Timing [{trace.request_id}]: {trace.summary()}")
     
     if error_msg:
         return f"{error_msg}\n\nPlease try using the extract_transcript tool instead."
@@ -118,115 +236,109 @@ async def get_transcript(video_id: str, language: Optional[str] = None, ctx: Con
     # Return the successfully retrieved transcript
     transcript_info = f"Video ID: {video_id}\nLanguage: {transcript_language}\nSource: {transcript_source}\n\n"
     if ctx:
-        ctx.info(f"Successfully retrieved transcript ({len(transcript_text)} characters)")
+        await ctx.info(f"Successfully retrieved transcript ({len(transcript_text)} characters)")
     return transcript_info + transcript_text
 
 @mcp.tool()
-async def extract_transcript(video_id: str, language: Optional[str] = None, ctx: Context = None) -> str:
+async def extract_transcript(
+    video_id: str, 
+    language: Optional[str] = None, 
+    wait: bool = True, 
+    backend: Optional[str] = None,
+    ctx: Context = None
+) -> str:
     """
     Extract and transcribe audio from a YouTube video when no transcript is available
     
     Args:
         video_id: The YouTube video ID (e.g., dQw4w9WgXcQ from https://www.youtube.com/watch?v=dQw4w9WgXcQ)
         language: Preferred language for the transcript (en or vi)
+        wait: Wait for the transcript; if false, return a job ID to poll with get_extraction_job
+        backend: Transcription engine (whisper or faster-whisper); the server's default if not given
     
     Returns:
         The transcribed text from the video audio
     """
     if ctx:
-        ctx.info(f"Extracting transcript for video ID: {video_id}")
-    
-    transcript_text = None
-    transcript_language = None
-    whisper_lang = None
+        await ctx.info(f"Extracting transcript for video ID: {video_id}")
     
     try:
-        # Clean old temporary files
-        clean_temp_files()
+        manager = get_job_manager()
+        if manager is None:
+            return f"{EXTRACTION_DISABLED_ERROR}."
+        backend, backend_error = resolve_backend(backend)
+        if backend_error:
+            return backend_error
         
-        # If language is specified, use it for transcription
-        if language:
-            if language.lower() in ['en', 'english']:
-                whisper_lang = 'en'
-            elif language.lower() in ['vi', 'vietnamese']:
-                whisper_lang = 'vi'
+        # Extraction runs on the shared job queue (or the extraction tier, on
+        # lite servers) so it never blocks the event loop; the job records its
+        # stage timings under this call's request ID
+        with trace_tool(ctx):
+            job = await asyncio.to_thread(manager.submit, video_id, language, backend)
+        if not wait:
+            return f"Extraction job submitted.\nJob ID: {job.id}\nStatus: {job.status}\n\nUse get_extraction_job to check progress."
         
-        # Download audio
-        if ctx:
-            ctx.info("Downloading audio...")
-            await ctx.report_progress(0, 3)  # 3 steps: download, transcribe, cleanup
-        
-        audio_path, dl_error = download_audio(video_id)
-        if dl_error:
-            logger.error(f"Audio download error for video ID {video_id}: {dl_error}")
-            return f"No transcript available for this video. The system could not download the audio: {dl_error}"
+        last_progress = None
+        while not job.done:
+            if ctx and job.progress != last_progress:
+                last_progress = dict(job.progress)
+                await ctx.info(last_progress["message"])
+                await ctx.report_progress(last_progress["step"], last_progress["total"])
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            if job.remote:
+                await asyncio.to_thread(manager.refresh, job)
         
-        # Transcribe with Whisper
-        if audio_path:
-            try:
-                if ctx:
-                    ctx.info("Transcribing audio... (this may take a while)")
-                    await ctx.report_progress(1, 3)
-                
-                transcript_text, transcribe_error = transcribe_audio(audio_path, whisper_lang)
-                
-                # Clean up the audio file before doing any additional processing
-                try:
-                    if ctx:
-                        ctx.info("Cleaning up temporary files...")
-                        await ctx.report_progress(2, 3)
-                    os.remove(audio_path)
-                    logger.info(f"Removed audio file: {audio_path}")
-                except Exception as e:
-                    logger.warning(f"Failed to clean up temporary file: {str(e)}")
-                    if ctx:
-                        ctx.warning(f"Failed to clean up temporary file: {str(e)}")
-                
-                # Check for transcription errors
-                if transcribe_error:
-                    logger.error(f"Transcription error: {transcribe_error}")
-                    return f"Failed to transcribe audio: {transcribe_error}"
-                
-                # Process successful transcription
-                if transcript_text:
-                    # Try to detect language if not specified
-                    if not whisper_lang:
-                        try:
-                            transcript_language = detect(transcript_text[:100])
-                        except Exception as e:
-                            logger.warning(f"Language detection failed: {str(e)}")
-                            transcript_language = "unknown"
-                    else:
-                        transcript_language = whisper_lang
-                    
-                    if ctx:
-                        await ctx.report_progress(3, 3)
-                        ctx.info(f"Transcription complete, language: {transcript_language}")
-                    
-                    transcript_info = f"Video ID: {video_id}\nLanguage: {transcript_language or 'auto-detected'}\nSource: whisper_extraction\n\n"
-                    return transcript_info + transcript_text
-                else:
-                    logger.warning("Transcription completed but no text was produced")
-                    return "Failed to extract transcript from the video. The transcription process completed but no text was produced."
-            
-            except Exception as e:
-                logger.error(f"Error during transcription: {str(e)}")
-                
-                # Try to clean up the audio file if it exists
-                try:
-                    os.remove(audio_path)
-                except Exception:
-                    pass
-                
-                return f"Failed to transcribe audio due to an error: {str(e)}"
-        else:
-            logger.error("No audio path returned from download_audio")
-            return "Failed to extract transcript from the video. No audio could be downloaded."
+        if ctx:
+            await ctx.info(f"Timing [{job.request_id}]: {job.timing_summary()}")
+        return format_job_result(job)
     
     except Exception as e:
         logger.error(f"Unexpected error in extract_transcript: {str(e)}")
         return f"An unexpected error occurred: {str(e)}"
 
+@mcp.tool()
+async def get_extraction_job(job_id: str, ctx: Context = None) -> str:
+    """
+    Check the status of an extraction job submitted with extract_transcript(wait=False)
+    
+    Args:
+        job_id: The job ID returned when the extraction was submitted
+    
+    Returns:
+        The job status and progress, or the transcript once the job has completed
+    """
+    manager = get_job_manager()
+    if manager is None:
+        return f"{EXTRACTION_DISABLED_ERROR}."
+    
+    job = await asyncio.to_thread(manager.get, job_id)
+    if not job:
+        return f"Unknown job: {job_id}"
+    
+    if not job.done:
+        progress = job.progress
+        return f"Job ID: {job.id}\nStatus: {job.status}\nProgress: {progress['step']}/{progress['total']} - {progress['message']}"
+    
+    return format_job_result(job)
+
+def format_job_result(job) -> str:
+    """Format a finished extraction job as tool output"""
+    if job.status == "cancelled":
+        return f"Extraction job {job.id} was cancelled."
+    
+    if job.error:
+        if job.error.startswith(AUDIO_DOWNLOAD_ERROR):
+            return f"No transcript available for this video. The system could not download the audio: {job.error}"
+        logger.error(f"Extraction error for video ID {job.video_id}: {job.error}")
+        return f"Failed to extract transcript from the video: {job.error}"
+    
+    result = job.result
+    transcript_info = (
+        f"Video ID: {job.video_id}\nLanguage: {result['language'] or 'auto-detected'}\nSource: {result['source']}\n"
+        f"Backend: {result.get('backend') or 'unknown'}\n\n"
+    )
+    return transcript_info + result["transcript"]
+
 @mcp.tool()
 async def search_youtube_video(search_query: str, ctx: Context = None) -> str:
     """
@@ -240,21 +352,20 @@ async def search_youtube_video(search_query: str, ctx: Context = None) -> str:
     """
     try:
         if ctx:
-            ctx.info(f"Searching for YouTube videos: {search_query}")
+            await ctx.info(f"Searching for YouTube videos: {search_query}")
         
-        s = Search(search_query)
-        results = s.results
+        # Show top 5 results
+        results = await run_blocking("search", search_videos, search_query, 5)
         
         if not results:
             return "No results found for your search query."
         
-        # Show top 5 results
         output = "Top YouTube search results:\n\n"
-        for i, video in enumerate(results[:5], 1):
-            output += f"{i}. {video.title}\n"
-            output += f"   Video ID: {video.video_id}\n"
-            output += f"   Channel: {video.author}\n"
-            output += f"   URL: https://www.youtube.com/watch?v={video.video_id}\n\n"
+        for i, video in enumerate(results, 1):
+            output += f"{i}. {video['title']}\n"
+            output += f"   Video ID: {video['video_id']}\n"
+            output += f"   Channel: {video['author']}\n"
+            output += f"   URL: https://www.youtube.com/watch?v={video['video_id']}\n\n"
         
         return output
     
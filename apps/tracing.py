@@ -0,0 +1,119 @@
+"""
+Lightweight per-request tracing: named spans collected under a request ID
+"""
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Header used to accept a caller's request ID and echo it back
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+class Span:
+    """One timed stage of a request"""
+
+    def __init__(self, name: str, request_id: Optional[str] = None):
+        self.name = name
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.error = None
+
+class Trace:
+    """
+    Spans recorded for one request
+
+    Spans may be added from several threads (executor workers, batch
+    fetchers), so the span list is guarded by a lock.
+    """
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    def add(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def breakdown(self) -> List[dict]:
+        """Total duration per stage, in the order each stage first started"""
+        totals = {}
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span.start)
+        for span in spans:
+            stage = totals.setdefault(span.name, {"stage": span.name, "ms": 0.0, "count": 0, "errors": 0})
+            stage["ms"] += span.duration * 1000
+            stage["count"] += 1
+            stage["errors"] += 1 if span.error else 0
+        for stage in totals.values():
+            stage["ms"] = round(stage["ms"], 1)
+        return list(totals.values())
+
+    def server_timing(self) -> str:
+        """Stage breakdown formatted as a Server-Timing header value"""
+        entries = [f"{stage['stage']};dur={stage['ms']}" for stage in self.breakdown()]
+        entries.append(f"total;dur={round(self.elapsed * 1000, 1)}")
+        return ", ".join(entries)
+
+    def summary(self) -> str:
+        """Human-readable stage breakdown for logs and MCP messages"""
+        return format_breakdown(self.breakdown())
+
+def format_breakdown(breakdown: List[dict]) -> str:
+    """Human-readable form of a Trace.breakdown() list"""
+    parts = [
+        f"{stage['stage']} {stage['ms']} ms" + (f" (x{stage['count']})" if stage["count"] > 1 else "")
+        for stage in breakdown
+    ]
+    return ", ".join(parts) or "no stages recorded"
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the request being handled, if any"""
+    return _current_trace.get()
+
+def activate_trace(trace: Trace):
+    """Make trace current; returns a token for deactivate_trace"""
+    return _current_trace.set(trace)
+
+def deactivate_trace(token):
+    """Restore whatever trace was current before activate_trace"""
+    _current_trace.reset(token)
+
+@contextmanager
+def start_trace(request_id: Optional[str] = None) -> Iterator[Trace]:
+    """Collect spans for a with-block under request_id (a new ID when not given)"""
+    trace = Trace(request_id)
+    token = activate_trace(trace)
+    try:
+        yield trace
+    finally:
+        deactivate_trace(token)
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """Time a block and record it in the current trace, if there is one"""
+    trace = current_trace()
+    current = Span(name, trace.request_id if trace else None)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = str(e) or type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        if trace is not None:
+            trace.add(current)
+            logger.debug(f"[{trace.request_id}] {name} took {current.duration * 1000:.1f} ms")
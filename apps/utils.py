@@ -2,16 +2,37 @@
 Shared utilities for YouTube transcript extraction
 """
 import os
+import json
+import uuid
+import hashlib
 import tempfile
 import logging
 import time
-from typing import Optional, Tuple, List, Union, Any
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Tuple, List, Union, Any, Callable, Iterator, Iterable
 
 from youtube_transcript_api import YouTubeTranscriptApi
-from pytube import YouTube
-# Use the correct whisper import for OpenAI's speech recognition model
-import whisper
-from langdetect import detect
+# pytube, whisper (torch), langdetect and numpy are imported on first use, so
+# caption-only requests never pay for loading them
+
+from apps.cache import TranscriptCache
+from apps.http_pool import get_http_session, install_pytube_session
+from apps.workers import get_worker_pool, start_worker_pool
+from apps.backends import get_backend, resolve_backend
+from apps.chunking import (
+    transcribe_chunked, iter_chunked_transcription, transcribe_windows, merge_transcriptions,
+    check_chunk_seconds, CHUNKED_TRANSCRIPTION, CHUNK_SECONDS, CHUNK_PARALLELISM
+)
+from apps.downloader import download_ranges, DOWNLOAD_PARALLELISM
+from apps.janitor import get_janitor
+from apps.workspace import Workspace, SharedArtifacts
+from apps.metrics import MetricsRegistry
+from apps.tracing import span
+from apps.extraction_tier import get_extraction_tier
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -20,66 +41,423 @@ logger = logging.getLogger(__name__)
 # Create temporary directory for downloads
 TEMP_DIR = os.path.join(tempfile.gettempdir(), 'youtube_transcripts')
 os.makedirs(TEMP_DIR, exist_ok=True)
+# Ranged downloads are staged here at a stable per-video path, so an
+# interrupted download resumes on the next attempt
+PARTIAL_DIR = os.path.join(TEMP_DIR, 'partial')
 
 # Initialize whisper model (load on startup)
-MODEL = None  # We'll load it lazily on first use
-
-# Import Context type, but make it optional since Flask doesn't use it
-try:
-    from mcp.server.fastmcp import Context
-except ImportError:
-    Context = None
-
-def get_whisper_model():
-    """Get or initialize the Whisper model"""
-    global MODEL
-    if MODEL is None:
-        logger.info("Loading Whisper model...")
-        MODEL = whisper.load_model("base")
-    return MODEL
+MODELS = {}  # In-process models by backend name, loaded lazily on first use
+_model_lock = threading.Lock()
+WHISPER_MODEL_NAME = os.environ.get('WHISPER_MODEL', 'base')
+
+# Persistent transcript cache settings. The cache lives outside TEMP_DIR so
+# the temp-directory janitor never removes it.
+CACHE_DIR = os.environ.get(
+    'TRANSCRIPT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'youtube_transcript_cache')
+)
+CACHE_ENABLED = os.environ.get('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_MAX_BYTES = int(os.environ.get('TRANSCRIPT_CACHE_MAX_MB', '512')) * 1024 * 1024
+CACHE_TTL = int(os.environ.get('TRANSCRIPT_CACHE_TTL', str(7 * 24 * 3600)))
+TRANSCRIPT_CACHE = None  # Opened lazily on first use
+_cache_lock = threading.Lock()
+
+# Negative cache lifetimes for classified failures, in seconds
+FAILURE_CACHE_TTL = {
+    "permanent": int(os.environ.get('FAILURE_CACHE_PERMANENT_TTL', '3600')),
+    "transient": int(os.environ.get('FAILURE_CACHE_TRANSIENT_TTL', '60')),
+}
+
+# Exception class names (from youtube_transcript_api, pytube and requests)
+# that identify a failure which won't go away by retrying soon
+PERMANENT_FAILURE_TYPES = {
+    'TranscriptsDisabled', 'NoTranscriptFound', 'NoTranscriptAvailable', 'VideoUnavailable',
+    'VideoUnplayable', 'InvalidVideoId', 'AgeRestricted', 'AgeRestrictedError', 'VideoPrivate',
+    'MembersOnly', 'RecordingUnavailable', 'LiveStreamError', 'VideoRegionBlocked',
+}
+TRANSIENT_FAILURE_TYPES = {
+    'TooManyRequests', 'RequestBlocked', 'IpBlocked', 'YouTubeRequestFailed', 'ConnectionError',
+    'Timeout', 'ReadTimeout', 'ConnectTimeout', 'TimeoutError', 'URLError', 'IncompleteRead',
+}
+TRANSIENT_FAILURE_MARKERS = ['429', 'too many requests', 'timed out', 'timeout', 'connection', 'temporar', 'blocking']
+PERMANENT_FAILURE_MARKERS = [
+    'private', 'unavailable', 'disabled', 'removed', 'age restricted', 'members only', 
+    'no transcripts were found', 'no audio stream',
+]
+
+# Transcript track listings are kept in memory briefly; the track URLs they
+# hold are signed and expire
+LISTING_CACHE_TTL = int(os.environ.get('LISTING_CACHE_TTL', '600'))
+_listing_cache = {}
+_listing_lock = threading.Lock()
+
+# Pipe audio from YouTube through ffmpeg into Whisper instead of downloading
+# it to TEMP_DIR first
+STREAMING_EXTRACTION = os.environ.get('STREAMING_EXTRACTION', 'false').lower() == 'true'
+
+# Window length for incremental (streamed) Whisper transcription, in seconds
+STREAM_WINDOW_SECONDS = check_chunk_seconds(
+    'STREAM_WINDOW_SECONDS', float(os.environ.get('STREAM_WINDOW_SECONDS', '30'))
+)
+
+# Batch endpoints: default and maximum number of videos fetched at once
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '8'))
+BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', '32'))
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '1000'))
+
+# Error prefix used by extract_audio_transcript when the audio can't be downloaded
+AUDIO_DOWNLOAD_ERROR = "Audio download error"
+
+# "lite" servers only serve captions: Whisper is never loaded and extractions
+# are forwarded to the extraction tier (EXTRACTION_TIER_URL)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'full').lower()
+LITE_MODE = SERVER_MODE == 'lite'
+
+# Error returned by lite servers for extractions when no extraction tier is configured
+EXTRACTION_DISABLED_ERROR = "Audio extraction is disabled on this caption-only server"
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one in-flight computation
+    
+    The first caller for a key runs the function; callers arriving while it is
+    still running wait for it and receive the same result (or exception).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key: Any, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless a call with the same key is already running"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+        
+        if not leader:
+            logger.info(f"Joining in-flight request for {key}")
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        
+        try:
+            call["result"] = fn(*args, **kwargs)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["event"].set()
+    
+    def in_flight(self) -> int:
+        """Number of computations currently running"""
+        with self._lock:
+            return len(self._calls)
+
+# Shared by Flask request threads and MCP tools (which call in via worker threads)
+INFLIGHT = SingleFlight()
+
+# Process-wide metrics, served at /metrics (Flask) or on METRICS_PORT (MCP)
+METRICS = MetricsRegistry()
+STAGE_SECONDS = METRICS.histogram(
+    "youtube_transcript_stage_seconds",
+    "Time spent in each stage of transcript retrieval",
+    labels=("stage",)
+)
+TRANSCRIPT_SOURCE_TOTAL = METRICS.counter(
+    "youtube_transcript_source_total",
+    "Transcripts served, by source (youtube_api or whisper_extraction)",
+    labels=("source",)
+)
+FAILURES_TOTAL = METRICS.counter(
+    "youtube_transcript_failures_total",
+    "Classified failures, by kind (captions or download) and category (permanent or transient)",
+    labels=("kind", "category")
+)
+MODEL_LOAD_SECONDS = METRICS.histogram(
+    "youtube_transcript_model_load_seconds",
+    "Time to load the Whisper model, in-process or across the worker pool",
+    labels=("where",),
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+@contextmanager
+def observe_stage(stage: str):
+    """Time a block as a span of the current trace and in the per-stage latency histogram"""
+    with span(stage) as current:
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.observe(time.perf_counter() - current.start, stage=stage)
+
+def _pytube():
+    """Import pytube on first use, routing its requests through the shared session"""
+    import pytube
+    # Send pytube's requests (info, search, downloads) through the shared
+    # keep-alive session, like youtube_transcript_api's
+    install_pytube_session()
+    return pytube
+
+def get_whisper_model(backend: Optional[str] = None):
+    """Get or initialize the in-process Whisper model of a transcription backend (default: TRANSCRIPTION_BACKEND)"""
+    engine = get_backend(backend)
+    model = MODELS.get(engine.name)
+    if model is None:
+        # Warmup may be loading the model while the first requests arrive
+        with _model_lock:
+            model = MODELS.get(engine.name)
+            if model is None:
+                logger.info(f"Loading {engine.name} model ({WHISPER_MODEL_NAME})...")
+                started = time.perf_counter()
+                model = MODELS[engine.name] = engine.load(WHISPER_MODEL_NAME)
+                MODEL_LOAD_SECONDS.observe(time.perf_counter() - started, where="in_process")
+    return model
+
+def start_whisper_workers() -> Optional[Any]:
+    """Start the Whisper worker pool (if configured) and record how long the models took to load"""
+    if LITE_MODE:
+        logger.info("Caption-only (lite) mode: Whisper is not loaded")
+        return None
+    started = time.perf_counter()
+    pool = start_worker_pool(WHISPER_MODEL_NAME)
+    if pool is not None:
+        MODEL_LOAD_SECONDS.observe(time.perf_counter() - started, where="worker_pool")
+    return pool
+
+def get_transcript_cache() -> Optional[TranscriptCache]:
+    """Get or open the persistent transcript cache (None when disabled)"""
+    global TRANSCRIPT_CACHE
+    if not CACHE_ENABLED:
+        return None
+    if TRANSCRIPT_CACHE is None:
+        with _cache_lock:
+            if TRANSCRIPT_CACHE is None:
+                path = os.path.join(CACHE_DIR, 'transcripts.sqlite3')
+                logger.info(f"Opening transcript cache at {path}")
+                TRANSCRIPT_CACHE = TranscriptCache(path, CACHE_MAX_BYTES, CACHE_TTL)
+    return TRANSCRIPT_CACHE
+
+def _transcript_cache_key(video_id: str, language: Optional[str], source: str, backend: Optional[str] = None) -> str:
+    """
+    Build the cache key for a (video, requested language, source) triple
+
+    Extractions also key on the backend's cache tag (engine plus settings such
+    as quantization or compute type) and the model name, like the Whisper
+    output cache, so changing WHISPER_MODEL, WHISPER_QUANTIZE or
+    CT2_COMPUTE_TYPE never serves the previous model's transcripts.
+    """
+    key = f"{video_id}:{normalize_language(language) or 'auto'}:{source}"
+    if not backend:
+        return key
+    return f"{key}:{get_backend(backend).cache_tag(WHISPER_MODEL_NAME)}:{WHISPER_MODEL_NAME}"
+
+def get_cached_transcript(
+    video_id: str, 
+    language: Optional[str], 
+    source: str, 
+    backend: Optional[str] = None
+) -> Optional[dict]:
+    """Look up a cached transcript keyed by video ID, requested language, source and (for extractions) backend"""
+    cache = get_transcript_cache()
+    if cache is None:
+        return None
+    with observe_stage("cache_lookup"):
+        return cache.get("transcript", _transcript_cache_key(video_id, language, source, backend))
+
+def cache_transcript(
+    video_id: str, 
+    language: Optional[str], 
+    source: str, 
+    transcript_text: str, 
+    transcript_language: Optional[str],
+    backend: Optional[str] = None
+):
+    """Store a transcript in the persistent cache, recording the backend that produced an extraction"""
+    cache = get_transcript_cache()
+    if cache is None:
+        return
+    entry = {"text": transcript_text, "language": transcript_language}
+    if backend:
+        entry["backend"] = backend
+        entry["model"] = WHISPER_MODEL_NAME
+    cache.set("transcript", _transcript_cache_key(video_id, language, source, backend), entry)
+
+def classify_failure(error: Union[BaseException, str]) -> str:
+    """Classify a failure as 'permanent' (private, removed, no captions) or 'transient'"""
+    if isinstance(error, BaseException):
+        names = {cls.__name__ for cls in type(error).__mro__}
+        if names & TRANSIENT_FAILURE_TYPES:
+            return "transient"
+        if names & PERMANENT_FAILURE_TYPES:
+            return "permanent"
+    
+    message = str(error).lower()
+    if any(marker in message for marker in TRANSIENT_FAILURE_MARKERS):
+        return "transient"
+    if any(marker in message for marker in PERMANENT_FAILURE_MARKERS):
+        return "permanent"
+    
+    # Unknown failures get the short TTL
+    return "transient"
+
+def combine_failure_categories(categories: List[str]) -> str:
+    """A run of attempts failed permanently only if every attempt did"""
+    if categories and all(category == "permanent" for category in categories):
+        return "permanent"
+    return "transient"
+
+def get_cached_failure(kind: str, video_id: str, language: Optional[str] = None) -> Optional[dict]:
+    """Look up a remembered failure for captions ('captions') or audio downloads ('download')"""
+    cache = get_transcript_cache()
+    if cache is None:
+        return None
+    return cache.get("failure", f"{kind}:{video_id}:{normalize_language(language) or 'auto'}")
+
+def cache_failure(kind: str, video_id: str, error_msg: str, category: str, language: Optional[str] = None):
+    """Remember a classified failure with the TTL for its category"""
+    FAILURES_TOTAL.inc(kind=kind, category=category)
+    cache = get_transcript_cache()
+    if cache is None:
+        return
+    logger.info(f"Caching {category} {kind} failure for video ID {video_id}")
+    cache.set(
+        "failure", 
+        f"{kind}:{video_id}:{normalize_language(language) or 'auto'}", 
+        {"error": error_msg, "category": category}, 
+        ttl=FAILURE_CACHE_TTL[category]
+    )
+
+# Downloaded audio shared by concurrent extractions of the same video
+SHARED_DOWNLOADS = SharedArtifacts(get_janitor(TEMP_DIR))
+
+METRICS.gauge(
+    "youtube_transcript_temp_dir_bytes",
+    "Bytes in the temporary download directory as of the janitor's last sweep",
+    callback=lambda: get_janitor(TEMP_DIR).usage()["bytes"]
+)
+
+def start_temp_janitor():
+    """Start the background janitor that enforces age and size limits on TEMP_DIR"""
+    janitor = get_janitor(TEMP_DIR)
+    janitor.start()
+    return janitor
 
 def clean_temp_files():
-    """Clean temporary files older than 1 hour"""
-    current_time = time.time()
-    for filename in os.listdir(TEMP_DIR):
-        file_path = os.path.join(TEMP_DIR, filename)
-        # If file is older than 1 hour, remove it
-        if os.path.isfile(file_path) and os.stat(file_path).st_mtime < current_time - 3600:
-            try:
-                os.remove(file_path)
-                logger.info(f"Removed old temporary file: {file_path}")
-            except Exception as e:
-                logger.error(f"Error removing temporary file {file_path}: {str(e)}")
+    """Sweep TEMP_DIR now; the background janitor also does this periodically"""
+    get_janitor(TEMP_DIR).sweep()
+
+def get_janitor_usage() -> dict:
+    """Disk usage of TEMP_DIR as tracked by the janitor"""
+    return get_janitor(TEMP_DIR).usage()
 
-def download_audio(video_id: str) -> Tuple[Optional[str], Optional[str]]:
-    """Download audio from YouTube video"""
+def audio_file_path(video_id: str, download_id: Optional[str] = None) -> str:
+    """Path download_audio writes a video's audio to, unique per download when download_id is given"""
+    filename = f"{video_id}.{download_id}.mp4" if download_id else f"{video_id}.mp4"
+    return os.path.join(TEMP_DIR, filename)
+
+@contextmanager
+def partial_download(video_id: str) -> Iterator[str]:
+    """
+    Stable staging path for a video's ranged download, held exclusively
+
+    download_ranges keeps its resumable .part and .ranges files next to this
+    path. A file lock serializes downloads of the same video across threads
+    and processes, so none of them truncates another's part file, and a
+    download that was interrupted (or crashed) is resumed by the next one.
+    """
+    import fcntl
+
+    os.makedirs(PARTIAL_DIR, exist_ok=True)
+    path = os.path.join(PARTIAL_DIR, f"{video_id}.mp4")
+    with get_janitor(TEMP_DIR).in_use(path), open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            os.utime(lock_file.name)  # Fresh for the janitor's age limit while held
+            yield path
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def acquire_audio(video_id: str, workspace: Optional[Workspace] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get a shared reference to a video's downloaded audio, downloading it if needed
+    
+    Always pair with SHARED_DOWNLOADS.release(video_id), even on error.
+    Jobs in this process share one file; each download gets its own path, so
+    other processes (Flask and MCP, several WSGI workers) downloading the
+    same video never truncate or replace it.
+    """
+    output_path = audio_file_path(video_id, uuid.uuid4().hex[:12])
+    return SHARED_DOWNLOADS.acquire(
+        video_id, lambda: download_audio(video_id, workspace, output_path), pin_path=output_path
+    )
+
+def download_audio(
+    video_id: str, 
+    workspace: Optional[Workspace] = None, 
+    output_path: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """Download audio from YouTube video (staged in the job's workspace when given)"""
+    with observe_stage("audio_download"):
+        return _download_audio(video_id, workspace, output_path or audio_file_path(video_id))
+
+def _download_audio(
+    video_id: str, 
+    workspace: Optional[Workspace], 
+    output_path: str
+) -> Tuple[Optional[str], Optional[str]]:
+    """Download attempts behind download_audio"""
+    # Answer repeats for videos whose audio recently failed to download
+    failure = get_cached_failure("download", video_id)
+    if failure:
+        logger.info(f"Skipping download for video ID {video_id}: cached {failure['category']} failure")
+        return None, failure["error"]
+    
+    categories = []
     try:
         # Try to download using pytube
         url = f"https://www.youtube.com/watch?v={video_id}"
         logger.info(f"Attempting to download audio from: {url}")
+        pytube = _pytube()
         
         # Make multiple attempts with different configurations
         for attempt in range(3):
             try:
                 logger.info(f"Download attempt {attempt+1}...")
                 if attempt == 0:
-                    yt = YouTube(url)
+                    yt = pytube.YouTube(url)
                 elif attempt == 1:
                     # Try with different options
-                    yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
+                    yt = pytube.YouTube(url, use_oauth=False, allow_oauth_cache=False)
                 else:
                     # Try another approach
-                    yt = YouTube(url, use_oauth=False, allow_oauth_cache=False)
+                    yt = pytube.YouTube(url, use_oauth=False, allow_oauth_cache=False)
                 
                 # Try to get streams
                 audio_stream = yt.streams.filter(only_audio=True).first()
                 if not audio_stream:
                     logger.warning("No audio stream available for this video")
+                    categories.append("permanent")
                     continue
                 
-                # Download to temp directory
-                output_path = os.path.join(TEMP_DIR, f"{video_id}.mp4")
-                audio_stream.download(output_path=TEMP_DIR, filename=f"{video_id}.mp4")
+                # Download to temp directory, in parallel ranges when enabled
+                filename = os.path.basename(output_path)
+                if DOWNLOAD_PARALLELISM > 1:
+                    # Ranges go to a resumable .part file at the video's stable
+                    # staging path; the finished file is moved to this download's path
+                    with partial_download(video_id) as partial_path:
+                        staged_path = download_ranges(audio_stream.url, partial_path, audio_stream.filesize)
+                        os.replace(staged_path, output_path)
+                elif workspace:
+                    # Stage in the workspace so a partial file is never visible at output_path
+                    staged_path = audio_stream.download(output_path=workspace.path, filename=filename)
+                    os.replace(staged_path, output_path)
+                else:
+                    audio_stream.download(output_path=TEMP_DIR, filename=filename)
                 
                 # Check if file was actually downloaded
                 if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -87,35 +465,102 @@ def download_audio(video_id: str) -> Tuple[Optional[str], Optional[str]]:
                     return output_path, None
                 else:
                     logger.warning(f"Download appeared to succeed but file is missing or empty: {output_path}")
+                    categories.append("transient")
                     
             except Exception as e:
                 logger.warning(f"Download attempt {attempt+1} failed: {str(e)}")
+                categories.append(classify_failure(e))
         
         # If all attempts failed, return error
         error_msg = "Failed to download audio after multiple attempts. The video may be restricted, private, or age-limited."
         logger.error(error_msg)
+        cache_failure("download", video_id, error_msg, combine_failure_categories(categories))
         return None, error_msg
             
     except Exception as e:
         logger.error(f"Error downloading audio: {str(e)}")
+        cache_failure("download", video_id, str(e), classify_failure(e))
         return None, str(e)
 
-def transcribe_audio(audio_path: str, language: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
-    """Transcribe audio using Whisper"""
+def hash_audio_file(audio_path: str) -> str:
+    """Return the SHA-256 hex digest of an audio file's contents"""
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transcribe_audio_result(
+    audio_path: str, 
+    language: Optional[str] = None, 
+    chunked: Optional[bool] = None,
+    backend: Optional[str] = None,
+    **decode_options
+) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Transcribe audio using Whisper, reusing cached results for identical audio
+    
+    The cache key covers the audio content hash, the backend, the model name
+    and all decode options, so changing any of them produces a fresh transcription.
+    
+    Args:
+        audio_path: Path of the downloaded audio
+        language: Language code, auto-detected if not given
+        chunked: Split long audio at silences and transcribe chunks in parallel
+            (defaults to the CHUNKED_TRANSCRIPTION setting)
+        backend: Transcription backend (defaults to TRANSCRIPTION_BACKEND)
+        decode_options: Extra options passed to the backend's transcribe
+    
+    Returns:
+        Tuple of (result, error_message) where result has text, segments, language and backend
+    """
     try:
-        model = get_whisper_model()
-        
         # Use specific language if provided, otherwise auto-detect
+        options = dict(decode_options)
         if language:
-            result = model.transcribe(audio_path, language=language)
-        else:
-            result = model.transcribe(audio_path)
+            options['language'] = language
+        if chunked is None:
+            chunked = CHUNKED_TRANSCRIPTION
+        engine = get_backend(backend)
+        
+        cache = get_transcript_cache()
+        cache_key = None
+        if cache is not None:
+            with observe_stage("audio_hash"):
+                audio_hash = hash_audio_file(audio_path)
+            key_options = dict(options, chunk_seconds=CHUNK_SECONDS) if chunked else options
+            cache_key = f"{audio_hash}:{engine.cache_tag(WHISPER_MODEL_NAME)}:{WHISPER_MODEL_NAME}:{json.dumps(key_options, sort_keys=True)}"
+            cached = cache.get("whisper", cache_key)
+            if cached:
+                logger.info(f"Using cached Whisper result for {audio_path}")
+                return cached, None
         
-        return result["text"], None
+        # Chunked mode fans out over the worker pool; otherwise hand the whole
+        # file to the pool when configured, or run in-process
+        pool = get_worker_pool(WHISPER_MODEL_NAME)
+        with observe_stage("transcription"):
+            if chunked:
+                transcription = transcribe_chunked(audio_path, WHISPER_MODEL_NAME, options, backend=engine.name)
+            elif pool is not None:
+                transcription = pool.transcribe(audio_path, options, engine.name)
+            else:
+                transcription = engine.transcribe(get_whisper_model(engine.name), audio_path, options)
+        transcription["backend"] = engine.name
+        
+        if cache_key:
+            cache.set("whisper", cache_key, transcription)
+        return transcription, None
     except Exception as e:
         logger.error(f"Error transcribing audio: {str(e)}")
         return None, str(e)
 
+def transcribe_audio(audio_path: str, language: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Transcribe audio using Whisper"""
+    result, error = transcribe_audio_result(audio_path, language)
+    if error:
+        return None, error
+    return result["text"], None
+
 def get_language_preference(requested_lang: Optional[str] = None) -> List[str]:
     """Determine language preference order"""
     if requested_lang:
@@ -127,23 +572,85 @@ def get_language_preference(requested_lang: Optional[str] = None) -> List[str]:
     # Default preference order
     return ['en', 'vi']
 
+def normalize_language(language: Optional[str] = None) -> Optional[str]:
+    """Map a requested language to a supported language code, or None for auto-detect"""
+    if language:
+        if language.lower() in ['en', 'english']:
+            return 'en'
+        elif language.lower() in ['vi', 'vietnamese']:
+            return 'vi'
+    return None
+
 def get_video_info(video_id: str) -> dict:
     """Get basic information about a YouTube video"""
     try:
-        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
-        info = {
-            "title": yt.title,
-            "author": yt.author,
-            "length": yt.length,
-            "views": yt.views,
-            "publish_date": str(yt.publish_date) if yt.publish_date else None,
-            "description": yt.description
-        }
+        with observe_stage("video_info"):
+            yt = _pytube().YouTube(f"https://www.youtube.com/watch?v={video_id}")
+            info = {
+                "title": yt.title,
+                "author": yt.author,
+                "length": yt.length,
+                "views": yt.views,
+                "publish_date": str(yt.publish_date) if yt.publish_date else None,
+                "description": yt.description
+            }
         return info, None
     except Exception as e:
         logger.error(f"Error retrieving video information: {str(e)}")
         return None, str(e)
 
+def run_batch(
+    fn: Callable[[Any], Any], 
+    items: Iterable[Any], 
+    concurrency: int = BATCH_CONCURRENCY
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Call fn(item) for every item with at most `concurrency` calls in flight
+    
+    Yields (item, result) pairs in completion order. fn should report errors
+    in its return value; an exception it raises is yielded as the result.
+    Closing the iterator early cancels the calls that haven't started.
+    Each call runs in a copy of the caller's context, so it records spans
+    in the caller's trace.
+    """
+    pending = {}
+    remaining = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch")
+    
+    def submit_next() -> bool:
+        for item in remaining:
+            pending[executor.submit(contextvars.copy_context().run, fn, item)] = item
+            return True
+        return False
+    
+    try:
+        for _ in range(max(1, concurrency)):
+            if not submit_next():
+                break
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                submit_next()
+                yield item, result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def search_videos(query: str, limit: int = 5) -> List[dict]:
+    """Search YouTube and return the top results as plain dicts"""
+    results = _pytube().Search(query).results or []
+    # Reading title/author may fetch each video's page, so do it here rather
+    # than in the caller
+    return [
+        {"video_id": video.video_id, "title": video.title, "author": video.author}
+        for video in results[:limit]
+    ]
+
 def extract_video_id(video_url_or_id: str) -> str:
     """Extract video ID from URL or return as-is if already an ID"""
     video_id = video_url_or_id
@@ -154,6 +661,53 @@ def extract_video_id(video_url_or_id: str) -> str:
             video_id = video_url_or_id.split("youtu.be/")[1].split("?")[0]
     return video_id
 
+def list_video_transcripts(video_id: str) -> Any:
+    """List a video's transcript tracks with one call, reusing recent listings"""
+    now = time.time()
+    with _listing_lock:
+        entry = _listing_cache.get(video_id)
+        if entry and entry[0] > now:
+            return entry[1]
+    
+    with observe_stage("caption_listing"):
+        transcript_list = YouTubeTranscriptApi(http_client=get_http_session()).list(video_id)
+    
+    with _listing_lock:
+        # Drop expired listings so the in-memory cache stays bounded by recent traffic
+        for expired in [key for key, (expires_at, _) in _listing_cache.items() if expires_at <= now]:
+            del _listing_cache[expired]
+        _listing_cache[video_id] = (now + LISTING_CACHE_TTL, transcript_list)
+    return transcript_list
+
+def rank_transcript_tracks(transcript_list: Any, lang_preference: List[str]) -> List[Any]:
+    """
+    Order transcript tracks by preference
+    
+    For each preferred language, a manually created track comes before an
+    auto-generated one; tracks in other languages follow, manual first.
+    """
+    tracks = list(transcript_list)
+    
+    def base_language(track) -> str:
+        return track.language_code.split('-')[0].lower()
+    
+    ranked = []
+    for lang in lang_preference:
+        for generated in (False, True):
+            ranked.extend(
+                track for track in tracks 
+                if base_language(track) == lang and track.is_generated == generated and track not in ranked
+            )
+    for generated in (False, True):
+        ranked.extend(track for track in tracks if track.is_generated == generated and track not in ranked)
+    return ranked
+
+def caption_lines(fetched: Any) -> List[str]:
+    """Extract caption text lines from a fetched transcript (raw dicts or snippet objects)"""
+    if hasattr(fetched, 'to_raw_data'):
+        fetched = fetched.to_raw_data()
+    return [line['text'] if isinstance(line, dict) else line.text for line in fetched]
+
 def get_youtube_transcript(
     video_id: str, 
     language: Optional[str] = None, 
@@ -162,6 +716,8 @@ def get_youtube_transcript(
     """
     Common helper function to get YouTube transcript
     
+    Concurrent calls for the same video and language share one lookup.
+    
     Args:
         video_id: YouTube video ID
         language: Preferred language
@@ -170,91 +726,458 @@ def get_youtube_transcript(
     Returns:
         Tuple of (transcript_text, transcript_language, transcript_source, error_message)
     """
+    key = ("youtube_api", video_id, normalize_language(language) or 'auto')
+    with observe_stage("youtube_transcript"):
+        result = INFLIGHT.do(key, _fetch_youtube_transcript, video_id, language, ctx)
+    if result[0]:
+        TRANSCRIPT_SOURCE_TOTAL.inc(source=result[2])
+    return result
+
+def _fetch_youtube_transcript(
+    video_id: str, 
+    language: Optional[str] = None, 
+    ctx: Optional[Any] = None
+) -> Tuple[Optional[str], Optional[str], str, Optional[str]]:
+    """Look up a transcript in the cache, then on YouTube (see get_youtube_transcript)"""
     transcript_text = None
     transcript_language = None
     transcript_source = "youtube_api"
     error_msg = None
     
+    # Serve from the persistent cache before going to YouTube
+    cached = get_cached_transcript(video_id, language, transcript_source)
+    if cached:
+        if ctx:
+            ctx.info(f"Retrieved {cached['language']} transcript from cache")
+        return cached["text"], cached["language"], transcript_source, None
+    
+    # Answer repeats for videos that recently had no usable captions
+    failure = get_cached_failure("captions", video_id, language)
+    if failure:
+        if ctx:
+            ctx.info(f"Skipping YouTube API: cached {failure['category']} failure")
+        return None, None, transcript_source, failure["error"]
+    
+    # Failure category of each attempt, used to pick the negative cache TTL
+    categories = []
+    
     try:
         # Get language preference order
         lang_preference = get_language_preference(language)
         if ctx:
             ctx.info(f"Language preference order: {', '.join(lang_preference)}")
         
+        # One listing call tells us every available track; pick locally
+        transcript_list = list_video_transcripts(video_id)
+        candidates = rank_transcript_tracks(transcript_list, lang_preference)
+        if ctx:
+            available = ", ".join(
+                f"{track.language_code}{' (auto)' if track.is_generated else ''}" for track in candidates
+            )
+            ctx.info(f"Available transcripts: {available or 'none'}")
+        
         # Track attempts in case all fail
         attempt_results = []
         
-        # Try to get transcript in preferred languages
-        for lang in lang_preference:
+        # Fetch the best track; only fall through to the next one if it is unusable
+        for track in candidates:
+            label = f"{track.language_code}{' (auto-generated)' if track.is_generated else ''}"
             try:
                 if ctx:
-                    ctx.info(f"Attempting to fetch transcript in {lang}...")
+                    ctx.info(f"Attempting to fetch {label} transcript...")
                 
-                transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
-                transcript_text = "\n".join(line['text'] for line in transcript_list)
+                with observe_stage("caption_fetch"):
+                    transcript_text = "\n".join(caption_lines(track.fetch()))
                 
                 # Check if transcript is too short or contains placeholder text
                 if len(transcript_text) < 50 or "caption is updating" in transcript_text.lower():
-                    msg = f"Retrieved {lang} transcript is too short or contains placeholder text"
                     if ctx:
-                        ctx.info(msg)
-                    attempt_results.append(f"{lang}: Too short or placeholder")
+                        ctx.info(f"Retrieved {label} transcript is too short or contains placeholder text")
+                    attempt_results.append(f"{label}: Too short or placeholder")
+                    categories.append("transient")
                     transcript_text = None
                     continue
                 
                 # Valid transcript found
-                transcript_language = lang
+                transcript_language = track.language_code.split('-')[0]
                 if ctx:
-                    ctx.info(f"Retrieved valid {lang} transcript from YouTube API")
+                    ctx.info(f"Retrieved valid {label} transcript from YouTube API")
+                cache_transcript(video_id, language, transcript_source, transcript_text, transcript_language)
                 return transcript_text, transcript_language, transcript_source, None
                 
-            except Exception as lang_e:
-                error = str(lang_e)
+            except Exception as track_e:
+                error = str(track_e)
                 if ctx:
-                    ctx.info(f"No {lang} transcript available: {error}")
-                attempt_results.append(f"{lang}: {error}")
+                    ctx.info(f"Failed to fetch {label} transcript: {error}")
+                attempt_results.append(f"{label}: {error}")
+                categories.append(classify_failure(track_e))
                 continue
         
-        # If no specific language found, try with auto-generated
-        try:
-            if ctx:
-                ctx.info("Attempting to fetch auto-generated transcript...")
-            
-            transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-            transcript_text = "\n".join(line['text'] for line in transcript_list)
+        # If all attempts failed, return error details
+        if not attempt_results:
+            attempt_results.append("No transcript tracks listed for this video")
+            categories.append("permanent")
+        attempts_summary = "\n".join([f"- {attempt}" for attempt in attempt_results])
+        error_msg = f"No transcript available. Attempted:\n{attempts_summary}"
+        cache_failure("captions", video_id, error_msg, combine_failure_categories(categories), language)
+        return None, None, transcript_source, error_msg
             
-            # Check if transcript is too short or contains placeholder text
-            if transcript_text and (len(transcript_text) < 50 or "caption is updating" in transcript_text.lower()):
-                msg = "Retrieved auto transcript is too short or contains placeholder text"
-                if ctx:
-                    ctx.info(msg)
-                attempt_results.append("Auto-generated: Too short or placeholder")
-                transcript_text = None
-            elif transcript_text:
-                # Try to detect language
-                try:
-                    transcript_language = detect(transcript_text[:100])
-                except Exception as e:
-                    transcript_language = "unknown"
-                
-                if ctx:
-                    ctx.info(f"Retrieved transcript from YouTube API (auto language: {transcript_language})")
-                return transcript_text, transcript_language, transcript_source, None
-                
-        except Exception as e:
-            error_msg = str(e)
-            if ctx:
-                ctx.warning(f"Failed to get auto-generated transcript: {error_msg}")
-            attempt_results.append(f"Auto-generated: {error_msg}")
+    except Exception as e:
+        error_msg = f"No transcript available: {str(e)}"
+        if ctx:
+            ctx.warning(f"Failed to list transcripts: {str(e)}")
+        cache_failure("captions", video_id, error_msg, classify_failure(e), language)
+        return None, None, transcript_source, error_msg
+
+def extract_audio_transcript(
+    video_id: str, 
+    language: Optional[str] = None, 
+    ctx: Optional[Any] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str], str, Optional[str]]:
+    """
+    Common helper function to transcribe a YouTube video's audio with Whisper
+    
+    Concurrent calls for the same video, language and backend share one
+    download and transcription; only the first caller's ctx and progress
+    callback are used.
+    
+    Args:
+        video_id: YouTube video ID
+        language: Preferred language (en or vi), auto-detected otherwise
+        ctx: Optional MCP context for logging
+        progress: Optional callback called as progress(step, total, message)
+        backend: Transcription backend (defaults to TRANSCRIPTION_BACKEND)
+    
+    Returns:
+        Tuple of (transcript_text, transcript_language, transcript_source, error_message).
+        Download failures are reported with the AUDIO_DOWNLOAD_ERROR prefix.
+    """
+    backend, error_msg = resolve_backend(backend)
+    if error_msg:
+        return None, None, "whisper_extraction", error_msg
+    
+    key = ("whisper_extraction", video_id, normalize_language(language) or 'auto', backend)
+    extract = _forward_extraction if LITE_MODE else _extract_audio_transcript
+    with observe_stage("whisper_extraction"):
+        result = INFLIGHT.do(key, extract, video_id, language, ctx, progress, backend)
+    if result[0]:
+        TRANSCRIPT_SOURCE_TOTAL.inc(source=result[2])
+    return result
+
+def _forward_extraction(
+    video_id: str, 
+    language: Optional[str] = None, 
+    ctx: Optional[Any] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str], str, Optional[str]]:
+    """Run an extraction on the extraction tier and wait for it (lite mode; see extract_audio_transcript)"""
+    transcript_source = "whisper_extraction"
+    
+    cached = get_cached_transcript(video_id, language, transcript_source, backend)
+    if cached:
+        return cached["text"], cached["language"], transcript_source, None
+    
+    tier = get_extraction_tier()
+    if tier is None:
+        return None, None, transcript_source, EXTRACTION_DISABLED_ERROR
+    
+    if ctx:
+        ctx.info(f"Forwarding extraction to {tier.url}")
+    with observe_stage("extraction_tier"):
+        job = tier.wait(tier.submit(video_id, language, backend), progress)
+    if job.status != "completed":
+        return None, None, transcript_source, job.error or f"Extraction job {job.id} was {job.status}"
+    
+    result = job.result
+    cache_transcript(
+        video_id, language, result["source"], result["transcript"], result["language"], result.get("backend", backend)
+    )
+    return result["transcript"], result["language"], result["source"], None
+
+def _download_and_transcribe(
+    video_id: str, 
+    whisper_lang: Optional[str], 
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None
+) -> Tuple[Optional[dict], Optional[str]]:
+    """Download (or share) a video's audio, transcribe it and release the file"""
+    with Workspace(TEMP_DIR, get_janitor(TEMP_DIR)) as workspace:
+        # Download audio; concurrent jobs for the same video share one file
+        if progress:
+            progress(0, 3, "Downloading audio...")  # 3 steps: download, transcribe, cleanup
         
-        # If all attempts failed, return error details
-        if not transcript_text:
-            attempts_summary = "\n".join([f"- {attempt}" for attempt in attempt_results])
-            error_msg = f"No transcript available. Attempted:\n{attempts_summary}"
-            return None, None, transcript_source, error_msg
+        audio_path, dl_error = acquire_audio(video_id, workspace)
+        try:
+            if dl_error or not audio_path:
+                logger.error(f"Audio download error for video ID {video_id}: {dl_error}")
+                return None, f"{AUDIO_DOWNLOAD_ERROR}: {dl_error or 'no audio file produced'}"
             
+            # Transcribe with Whisper
+            if progress:
+                progress(1, 3, "Transcribing audio... (this may take a while)")
+            try:
+                transcription, transcribe_error = transcribe_audio_result(audio_path, whisper_lang, backend=backend)
+            except Exception as e:
+                transcription, transcribe_error = None, str(e)
+        finally:
+            # The file is removed once the last job using it releases it
+            if progress:
+                progress(2, 3, "Cleaning up temporary files...")
+            SHARED_DOWNLOADS.release(video_id)
+    
+    if transcribe_error:
+        logger.error(f"Transcription error: {transcribe_error}")
+        return None, f"Transcription error: {transcribe_error}"
+    return transcription, None
+
+def _stream_and_transcribe(
+    video_id: str, 
+    whisper_lang: Optional[str], 
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None
+) -> Tuple[Optional[dict], Optional[str]]:
+    """Transcribe a video's audio while it streams through ffmpeg, without a temp file"""
+    if progress:
+        progress(0, 3, "Resolving audio stream...")
+    
+    audio_stream, dl_error = resolve_audio_stream(video_id)
+    if dl_error:
+        logger.error(f"Audio stream error for video ID {video_id}: {dl_error}")
+        return None, f"{AUDIO_DOWNLOAD_ERROR}: {dl_error}"
+    
+    try:
+        if progress:
+            progress(1, 3, "Streaming and transcribing audio... (this may take a while)")
+        with observe_stage("transcription"):
+            transcription = merge_transcriptions(transcribe_audio_stream(audio_stream, whisper_lang, backend))
     except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
+        logger.error(f"Transcription error: {str(e)}")
+        return None, f"Transcription error: {str(e)}"
+    
+    if progress:
+        progress(2, 3, "Audio stream finished")
+    return transcription, None
+
+def _extract_audio_transcript(
+    video_id: str, 
+    language: Optional[str] = None, 
+    ctx: Optional[Any] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    backend: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str], str, Optional[str]]:
+    """Look up an extracted transcript in the cache, then download and transcribe (see extract_audio_transcript)"""
+    transcript_source = "whisper_extraction"
+    whisper_lang = normalize_language(language)
+    
+    # Serve from the persistent cache before downloading anything
+    cached = get_cached_transcript(video_id, language, transcript_source, backend)
+    if cached:
+        if ctx:
+            ctx.info(f"Retrieved extracted {cached['language']} transcript from cache")
+        return cached["text"], cached["language"], transcript_source, None
+    
+    # Stream the audio straight into the decoder, or download it first
+    if STREAMING_EXTRACTION:
+        transcription, error_msg = _stream_and_transcribe(video_id, whisper_lang, progress, backend)
+    else:
+        transcription, error_msg = _download_and_transcribe(video_id, whisper_lang, progress, backend)
+    if error_msg:
         return None, None, transcript_source, error_msg
     
-    return transcript_text, transcript_language, transcript_source, error_msg
\ No newline at end of file
+    transcript_text = transcription["text"]
+    if not transcript_text:
+        return None, None, transcript_source, "The transcription process completed but no text was produced."
+    
+    # Prefer the language Whisper detected, falling back to langdetect
+    transcript_language = whisper_lang or transcription.get("language")
+    if not transcript_language:
+        try:
+            from langdetect import detect
+
+            with observe_stage("language_detection"):
+                transcript_language = detect(transcript_text[:100])
+        except Exception as e:
+            logger.warning(f"Language detection failed: {str(e)}")
+            transcript_language = "unknown"
+    
+    cache_transcript(video_id, language, transcript_source, transcript_text, transcript_language, backend)
+    if progress:
+        progress(3, 3, f"Transcription complete, language: {transcript_language}")
+    return transcript_text, transcript_language, transcript_source, None
+
+def _transcribe_in_process(audio: Any, options: dict, backend: Optional[str] = None) -> Future:
+    """Run a backend on its in-process model and wrap the result in a completed Future"""
+    future = Future()
+    try:
+        engine = get_backend(backend)
+        future.set_result(engine.transcribe(get_whisper_model(engine.name), audio, options))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _whisper_submitter(backend: Optional[str] = None) -> Tuple[Callable[[Any, dict], Future], int]:
+    """Pick where windowed transcription runs: the worker pool if started, else in-process one at a time"""
+    pool = get_worker_pool(WHISPER_MODEL_NAME)
+    if pool is not None:
+        return functools.partial(pool.submit, backend=backend), CHUNK_PARALLELISM
+    return functools.partial(_transcribe_in_process, backend=backend), 1
+
+def resolve_audio_stream(video_id: str) -> Tuple[Optional[Any], Optional[str]]:
+    """Find a video's audio stream (for streaming extraction) without downloading it"""
+    failure = get_cached_failure("download", video_id)
+    if failure:
+        logger.info(f"Skipping audio stream for video ID {video_id}: cached {failure['category']} failure")
+        return None, failure["error"]
+    
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    categories = []
+    for attempt in range(3):
+        try:
+            logger.info(f"Audio stream lookup attempt {attempt+1}...")
+            pytube = _pytube()
+            yt = pytube.YouTube(url) if attempt == 0 else pytube.YouTube(url, use_oauth=False, allow_oauth_cache=False)
+            audio_stream = yt.streams.filter(only_audio=True).first()
+            if audio_stream:
+                return audio_stream, None
+            logger.warning("No audio stream available for this video")
+            categories.append("permanent")
+        except Exception as e:
+            logger.warning(f"Audio stream lookup attempt {attempt+1} failed: {str(e)}")
+            categories.append(classify_failure(e))
+    
+    error_msg = "Failed to find an audio stream after multiple attempts. The video may be restricted, private, or age-limited."
+    logger.error(error_msg)
+    cache_failure("download", video_id, error_msg, combine_failure_categories(categories))
+    return None, error_msg
+
+def transcribe_audio_stream(
+    audio_stream: Any, 
+    language: Optional[str] = None, 
+    backend: Optional[str] = None
+) -> Iterator[dict]:
+    """Transcribe a remote audio stream window by window while it is still downloading"""
+    from apps.audio_stream import iter_stream_windows
+
+    options = {'language': language} if language else {}
+    submit, parallelism = _whisper_submitter(backend)
+    windows = iter_stream_windows(audio_stream.url, STREAM_WINDOW_SECONDS)
+    return transcribe_windows(windows, options, submit, parallelism)
+
+def stream_transcript(
+    video_id: str, 
+    language: Optional[str] = None, 
+    force_extract: bool = False,
+    backend: Optional[str] = None
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield transcript events as soon as each part is available
+    
+    Cached and YouTube caption transcripts are emitted right away, one segment
+    per caption line. Whisper extraction is decoded in STREAM_WINDOW_SECONDS
+    windows and each window's segments are emitted once it is transcribed.
+    
+    Yields:
+        (event, data) tuples where event is one of meta, segment, done or error
+    """
+    backend, error_msg = resolve_backend(backend)
+    if error_msg:
+        yield "error", {"video_id": video_id, "error": error_msg}
+        return
+    
+    # Captions (served from the cache when possible)
+    if not force_extract:
+        transcript_text, transcript_language, transcript_source, _ = get_youtube_transcript(video_id, language)
+        if not transcript_text:
+            cached = get_cached_transcript(video_id, language, "whisper_extraction", backend)
+            if cached:
+                transcript_text, transcript_language = cached["text"], cached["language"]
+                transcript_source = "whisper_extraction"
+        
+        if transcript_text:
+            yield from _text_events(video_id, transcript_text, transcript_language, transcript_source)
+            return
+    
+    # Lite servers can't transcribe window by window; the extraction tier
+    # returns the whole transcript at once
+    if LITE_MODE:
+        transcript_text, transcript_language, transcript_source, error_msg = extract_audio_transcript(
+            video_id, language, backend=backend
+        )
+        if error_msg:
+            yield "error", {"video_id": video_id, "error": error_msg}
+            return
+        yield from _text_events(video_id, transcript_text, transcript_language, transcript_source)
+        return
+    
+    # Whisper extraction, window by window (straight from the audio stream
+    # when streaming extraction is enabled, else from a downloaded file)
+    if STREAMING_EXTRACTION:
+        audio_stream, dl_error = resolve_audio_stream(video_id)
+        if dl_error:
+            yield "error", {"video_id": video_id, "error": f"{AUDIO_DOWNLOAD_ERROR}: {dl_error}"}
+            return
+        yield from _stream_whisper_events(video_id, language, audio_stream, None, backend)
+        return
+    
+    with Workspace(TEMP_DIR, get_janitor(TEMP_DIR)) as workspace:
+        audio_path, dl_error = acquire_audio(video_id, workspace)
+        try:
+            if dl_error or not audio_path:
+                yield "error", {"video_id": video_id, "error": f"{AUDIO_DOWNLOAD_ERROR}: {dl_error or 'no audio file produced'}"}
+                return
+            yield from _stream_whisper_events(video_id, language, None, audio_path, backend)
+        finally:
+            SHARED_DOWNLOADS.release(video_id)
+
+def _text_events(
+    video_id: str, 
+    transcript_text: str, 
+    transcript_language: Optional[str], 
+    transcript_source: str
+) -> Iterator[Tuple[str, dict]]:
+    """Emit a finished transcript as SSE events, one segment per line (see stream_transcript)"""
+    yield "meta", {"video_id": video_id, "language": transcript_language, "source": transcript_source}
+    for line in transcript_text.split("\n"):
+        yield "segment", {"text": line}
+    yield "done", {"video_id": video_id, "language": transcript_language, "source": transcript_source}
+
+def _stream_whisper_events(
+    video_id: str, 
+    language: Optional[str], 
+    audio_stream: Optional[Any], 
+    audio_path: Optional[str],
+    backend: Optional[str] = None
+) -> Iterator[Tuple[str, dict]]:
+    """Transcribe a stream or downloaded file window by window, yielding SSE events (see stream_transcript)"""
+    transcript_source = "whisper_extraction"
+    whisper_lang = normalize_language(language)
+    
+    yield "meta", {"video_id": video_id, "language": whisper_lang, "source": transcript_source, "backend": backend}
+    
+    options = {'language': whisper_lang} if whisper_lang else {}
+    submit, parallelism = _whisper_submitter(backend)
+    texts = []
+    languages = []
+    try:
+        if audio_stream is not None:
+            results = transcribe_audio_stream(audio_stream, whisper_lang, backend)
+        else:
+            results = iter_chunked_transcription(audio_path, options, submit, STREAM_WINDOW_SECONDS, parallelism)
+        for result in results:
+            texts.append(result["text"])
+            languages.append(result["language"])
+            for segment in result["segments"]:
+                yield "segment", segment
+    except Exception as e:
+        logger.error(f"Error streaming transcription for video ID {video_id}: {str(e)}")
+        yield "error", {"video_id": video_id, "error": f"Transcription error: {str(e)}"}
+        return
+    
+    transcript_text = "".join(texts)
+    transcript_language = whisper_lang or next((lang for lang in languages if lang), None)
+    if transcript_text:
+        cache_transcript(video_id, language, transcript_source, transcript_text, transcript_language, backend)
+    yield "done", {"video_id": video_id, "language": transcript_language, "source": transcript_source, "backend": backend}
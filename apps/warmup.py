@@ -0,0 +1,147 @@
+"""
+Warm start: fetch and load the transcription model, run one inference and load langdetect's profiles
+
+Run `python -m apps.warmup` ahead of time (image build, init container) to
+download and verify the weights, or set PRELOAD_MODELS=true to warm up when
+a server starts; /ready reports ready only once warmup has finished.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import Optional, Tuple
+
+from apps.utils import get_whisper_model, observe_stage, WHISPER_MODEL_NAME, LITE_MODE
+from apps.workers import get_worker_pool
+from apps.backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Warm up when the servers start (server.py in the background, MCP before serving)
+PRELOAD_MODELS = os.environ.get('PRELOAD_MODELS', 'false').lower() == 'true'
+
+# Length of the silent clip used for the dummy inference, in seconds
+WARMUP_AUDIO_SECONDS = 1.0
+
+_status = {"status": "idle", "steps": {}, "error": None, "started_at": None, "finished_at": None}
+_status_lock = threading.Lock()
+_warmup_thread = None  # Set by start_warmup
+
+def fetch_model_weights(model_name: str = WHISPER_MODEL_NAME, backend: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Download the backend's weights into WHISPER_MODEL_DIR, or check the copy already there
+
+    Returns:
+        Tuple of (weights_path, error_message)
+    """
+    engine = get_backend(backend)
+    try:
+        path = engine.fetch(model_name)
+    except Exception as e:
+        return None, f"Failed to fetch {engine.name} weights for {model_name}: {str(e)}"
+    logger.info(f"{engine.name} weights for {model_name} verified at {path}")
+    return path, None
+
+def warm_transcriber():
+    """Load the default backend's model (in-process or in every worker) and run one inference on silence"""
+    import numpy as np
+
+    silence = np.zeros(int(WARMUP_AUDIO_SECONDS * 16000), dtype=np.float32)
+    pool = get_worker_pool(WHISPER_MODEL_NAME)
+    if pool is not None:
+        pool.warm_up()
+        pool.submit(silence, {"language": "en"}).result()
+    else:
+        get_backend().transcribe(get_whisper_model(), silence, {"language": "en"})
+
+def warm_language_detector():
+    """Load langdetect's language profiles, which it otherwise reads on the first detect()"""
+    from langdetect import detect
+    detect("This sentence only loads the language profiles.")
+
+def run_warmup(fetch_only: bool = False) -> Tuple[dict, Optional[str]]:
+    """
+    Run every warmup step in order, stopping at the first failure
+
+    Args:
+        fetch_only: Only download and verify the weights
+
+    Returns:
+        Tuple of (status, error_message); status has the seconds taken per step
+    """
+    steps = [("fetch_weights", fetch_model_weights)]
+    if not fetch_only:
+        steps += [("load_and_infer", warm_transcriber), ("language_detector", warm_language_detector)]
+    if LITE_MODE:
+        steps = []  # Lite servers never load Whisper or langdetect
+
+    with _status_lock:
+        _status.update(status="running", steps={}, error=None, started_at=time.time(), finished_at=None)
+
+    error = None
+    for name, step in steps:
+        logger.info(f"Warmup: {name}...")
+        started = time.perf_counter()
+        try:
+            with observe_stage(f"warmup_{name}"):
+                result = step()
+            if isinstance(result, tuple) and result[1]:
+                error = result[1]
+        except Exception as e:
+            error = f"Warmup step {name} failed: {str(e)}"
+        with _status_lock:
+            _status["steps"][name] = round(time.perf_counter() - started, 3)
+        if error:
+            logger.error(error)
+            break
+
+    with _status_lock:
+        _status.update(status="failed" if error else "ready", error=error, finished_at=time.time())
+    status = warmup_status()
+    if not error:
+        logger.info(f"Warmup finished: {status['steps']}")
+    return status, error
+
+def start_warmup() -> threading.Thread:
+    """Run warmup on a background thread, once per process; the server reports not ready until it succeeds"""
+    global _warmup_thread
+    with _status_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+        _status["status"] = "running"
+        _warmup_thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+def warmup_status() -> dict:
+    """
+    Warmup progress
+
+    ready is true once warmup has succeeded, or while it's idle when there is
+    nothing to preload (PRELOAD_MODELS off, or a lite server). A failed
+    warmup is never ready, so load balancers keep traffic away.
+    """
+    with _status_lock:
+        status = _status["status"]
+        ready = status == "ready" or (status == "idle" and (LITE_MODE or not PRELOAD_MODELS))
+        return dict(_status, steps=dict(_status["steps"]), ready=ready)
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Fetch, load and warm up the Whisper model and language detector")
+    parser.add_argument("--fetch-only", action="store_true",
+                        help="Only download and verify the weights into WHISPER_MODEL_DIR (e.g. at image build time)")
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    _, error = run_warmup(fetch_only=args.fetch_only)
+    if error:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Process pool for Whisper inference with models preloaded in each worker
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from typing import Optional, Any
+
+from apps.backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+# Number of Whisper worker processes; 0 runs inference in the calling process
+WHISPER_WORKERS = int(os.environ.get('WHISPER_WORKERS', '0'))
+
+WORKER_POOL = None  # Started lazily on first use (or at startup via start_worker_pool)
+_pool_lock = threading.Lock()
+
+# Models held by a worker process, by backend name; the default backend's
+# model is loaded by _init_worker, others on first use
+_worker_model_name = None
+_worker_models = {}
+
+def _worker_model(backend: str) -> Any:
+    """The worker's model for a backend, loaded on first use"""
+    if backend not in _worker_models:
+        logger.info(f"Worker {os.getpid()} loading {backend} model ({_worker_model_name})...")
+        _worker_models[backend] = get_backend(backend).load(_worker_model_name)
+    return _worker_models[backend]
+
+def _init_worker(model_name: str, backend: Optional[str] = None):
+    """Load the model once when a worker process starts"""
+    global _worker_model_name
+    logging.basicConfig(level=logging.INFO)
+    _worker_model_name = model_name
+    _worker_model(get_backend(backend).name)
+
+def _worker_ready() -> int:
+    """No-op task used to make sure a worker has started and loaded its model"""
+    return os.getpid()
+
+def _worker_transcribe(audio: Any, options: dict, backend: str) -> dict:
+    """Run a backend inside a worker process on a file path or a 16 kHz sample array"""
+    return get_backend(backend).transcribe(_worker_model(backend), audio, options)
+
+class WhisperWorkerPool:
+    """
+    Pool of worker processes that each hold a preloaded Whisper model
+
+    Audio paths and decode options go to the workers over the executor's IPC
+    queue, so inference never holds the GIL of the HTTP/MCP process.
+    """
+
+    def __init__(self, workers: int, model_name: str):
+        self.workers = workers
+        self.model_name = model_name
+        # spawn keeps torch state out of forked children
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name,)
+        )
+
+    def warm_up(self, timeout: Optional[float] = None):
+        """Start every worker and wait until each has loaded its model"""
+        futures = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+        wait(futures, timeout=timeout)
+        logger.info(f"Whisper worker pool ready ({self.workers} workers, model {self.model_name})")
+
+    def submit(self, audio: Any, options: dict, backend: Optional[str] = None) -> Future:
+        """Queue audio (a path or a 16 kHz sample array) for transcription in a worker"""
+        return self._executor.submit(_worker_transcribe, audio, options, get_backend(backend).name)
+
+    def transcribe(self, audio_path: str, options: dict, backend: Optional[str] = None) -> dict:
+        """Transcribe an audio file in a worker and return text, language and segments"""
+        return self.submit(audio_path, options, backend).result()
+
+    def shutdown(self):
+        """Stop all worker processes"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def get_worker_pool(model_name: str, workers: Optional[int] = None) -> Optional[WhisperWorkerPool]:
+    """
+    Get or start the shared worker pool
+
+    The pool is sized by WHISPER_WORKERS unless workers is given; returns None
+    when no pool is running and the requested size is 0.
+    """
+    global WORKER_POOL
+    size = WHISPER_WORKERS if workers is None else workers
+    if WORKER_POOL is None and size <= 0:
+        return None
+    if WORKER_POOL is None:
+        with _pool_lock:
+            if WORKER_POOL is None:
+                logger.info(f"Starting {size} Whisper worker processes...")
+                WORKER_POOL = WhisperWorkerPool(size, model_name)
+    return WORKER_POOL
+
+def start_worker_pool(model_name: str) -> Optional[WhisperWorkerPool]:
+    """Start the worker pool at server startup so models are loaded before the first request"""
+    pool = get_worker_pool(model_name)
+    if pool is not None:
+        pool.warm_up()
+    return pool
@@ -0,0 +1,122 @@
+"""
+Per-job workspaces and reference-counted shared downloads
+"""
+import os
+import uuid
+import shutil
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Workspace:
+    """
+    Private scratch directory for one extraction
+
+    Created under `<root>/work/<id>` on enter and removed with everything in
+    it on exit, so concurrent jobs never write to each other's files.
+    """
+
+    def __init__(self, root: str, janitor=None):
+        self.id = uuid.uuid4().hex
+        self.path = os.path.join(root, "work", self.id)
+        self._janitor = janitor
+
+    def __enter__(self) -> "Workspace":
+        os.makedirs(self.path, exist_ok=True)
+        if self._janitor:
+            self._janitor.pin(self.path)
+        return self
+
+    def __exit__(self, *exc):
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self._janitor:
+            self._janitor.unpin(self.path)
+        return False
+
+    def file(self, name: str) -> str:
+        """Path of a file inside the workspace"""
+        return os.path.join(self.path, name)
+
+class SharedArtifacts:
+    """
+    Reference-counted registry of files shared between concurrent jobs
+
+    The first job to acquire a key produces the file; jobs that acquire the
+    same key meanwhile wait for it and reuse it. The file is deleted when the
+    last holder releases it. Held files are pinned in the janitor.
+    """
+
+    def __init__(self, janitor=None):
+        self._janitor = janitor
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+
+    def acquire(
+        self,
+        key: str,
+        produce: Callable[[], Tuple[Optional[str], Optional[str]]],
+        pin_path: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Take a reference to the artifact for key, producing it if nobody has
+
+        Args:
+            key: Identity of the artifact (e.g. the video ID)
+            produce: Callable returning (path, error) that creates the file
+            pin_path: Path to protect from the janitor while referenced
+
+        Returns:
+            Tuple of (path, error_message); call release(key) when done either way
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            producer = entry is None
+            if producer:
+                entry = {"refs": 0, "event": threading.Event(), "path": None, "error": None, "pin": pin_path}
+                self._entries[key] = entry
+                if self._janitor and pin_path:
+                    self._janitor.pin(pin_path)
+            entry["refs"] += 1
+
+        if producer:
+            try:
+                entry["path"], entry["error"] = produce()
+            except Exception as e:
+                entry["path"], entry["error"] = None, str(e)
+            finally:
+                entry["event"].set()
+        else:
+            logger.info(f"Reusing shared download for {key} ({entry['refs']} holders)")
+            entry["event"].wait()
+
+        return entry["path"], entry["error"]
+
+    def release(self, key: str):
+        """Drop a reference; the file is deleted when the last reference goes"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del self._entries[key]
+
+        if entry["path"]:
+            try:
+                os.remove(entry["path"])
+                logger.info(f"Removed shared file: {entry['path']}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to clean up shared file {entry['path']}: {str(e)}")
+        if self._janitor and entry["pin"]:
+            self._janitor.unpin(entry["pin"])
+
+    def holders(self, key: str) -> int:
+        """Number of jobs currently holding the artifact for key"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry["refs"] if entry else 0
@@ -1,11 +1,18 @@
 #!/bin/bash
 set -e
 
+# SERVER_MODE=lite serves captions only: Whisper is never loaded and audio
+# extractions are forwarded to the extraction tier at EXTRACTION_TIER_URL
+export SERVER_MODE="${SERVER_MODE:-full}"
+if [ "$SERVER_MODE" = "lite" ] && [ -z "$EXTRACTION_TIER_URL" ]; then
+    echo "Warning: SERVER_MODE=lite without EXTRACTION_TIER_URL; audio extraction is disabled"
+fi
+
 # Run either the HTTP API or MCP server based on SERVER_TYPE
 if [ "$SERVER_TYPE" = "mcp" ]; then
-    echo "Starting MCP server..."
+    echo "Starting MCP server ($SERVER_MODE mode)..."
     exec python mcp_server.py
 else
-    echo "Starting HTTP API server..."
+    echo "Starting HTTP API server ($SERVER_MODE mode)..."
     exec python server.py
-fi
\ No newline at end of file
+fi
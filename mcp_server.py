@@ -3,11 +3,12 @@ Main entry point for YouTube Transcript MCP server
 """
 import logging
 from apps.mcp_server import mcp
+from apps.utils import LITE_MODE
 
 if __name__ == "__main__":
     # Setup logging
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
-    logger.info("Starting YouTube Transcript MCP Server...")
+    logger.info(f"Starting YouTube Transcript MCP Server{' (caption-only lite mode)' if LITE_MODE else ''}...")
     mcp.run()
\ No newline at end of file
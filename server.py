@@ -1,13 +1,29 @@
 """
 Main entry point for YouTube Transcript HTTP API server
 """
+import os
 import logging
 from apps.flask_server import app
+from apps.utils import start_whisper_workers, LITE_MODE
+from apps.warmup import start_warmup, PRELOAD_MODELS
 
 if __name__ == '__main__':
     # Setup logging
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
-    logger.info("Starting YouTube Transcript HTTP API Server...")
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    if LITE_MODE:
+        # Caption-only: nothing heavy to preload, and no reloader process to start
+        logger.info("Starting YouTube Transcript HTTP API Server (caption-only lite mode)...")
+        app.run(host='0.0.0.0', port=5001)
+    else:
+        logger.info("Starting YouTube Transcript HTTP API Server...")
+        
+        # Preload Whisper workers (only in the reloader's serving process), then
+        # warm up in the background; /ready reports 503 until that finishes
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            start_whisper_workers()
+            if PRELOAD_MODELS:
+                start_warmup()
+        
+        app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the YouTube Transcript servers (both HTTP and MCP)
+
+Runs the servers against a local YouTube stand-in (fake_youtube.py), drives
+each endpoint at fixed concurrency levels and reports throughput and
+p50/p95/p99 latency. Results are compared with stored baselines and the run
+fails when any measurement regresses past the tolerance.
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from fake_youtube import FakeYouTube
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Runs the Flask app without the debug reloader, which would skew timings
+FLASK_BOOTSTRAP = (
+    "import sys; from apps.flask_server import app; "
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"
+)
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """Throughput, error rate and latency percentiles (in milliseconds) for one run"""
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000
+    }
+
+def video_ids(run: int, count: int, prefix: str = "bm", pool: Optional[int] = None) -> List[str]:
+    """11-character video IDs; a pool size repeats IDs so caches get hits"""
+    return [f"{prefix}{run:03d}{(i % pool if pool else i):06d}" for i in range(count)]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def server_environment(upstream: str, cache_dir: str, warm_cache: bool) -> Dict[str, str]:
+    """Environment that points a server at the fake and keeps its caches out of the way"""
+    environment = os.environ.copy()
+    environment.update({
+        "YOUTUBE_UPSTREAM_URL": upstream,
+        "TRANSCRIPT_CACHE_DIR": cache_dir,
+        "TRANSCRIPT_CACHE_ENABLED": "true" if warm_cache else "false",
+        "LISTING_CACHE_TTL": "600" if warm_cache else "0",
+        "METRICS_PORT": "0",
+        "PYTHONPATH": ROOT_DIR
+    })
+    return environment
+
+class HTTPBenchmark:
+    """Drives the Flask server with a thread per virtual client"""
+
+    def __init__(self, environment: Dict[str, str]):
+        self.environment = environment
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+        self.session = requests.Session()
+        # One keep-alive connection per virtual client
+        self.session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=64))
+
+    def start(self, timeout: float = 60) -> bool:
+        """Start the server and wait for /health"""
+        logger.info(f"Starting HTTP server on port {self.port}...")
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", FLASK_BOOTSTRAP, str(self.port)],
+            cwd=ROOT_DIR,
+            env=self.environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                logger.error(f"HTTP server exited with code {self.process.returncode}")
+                return False
+            try:
+                if self.session.get(f"{self.base_url}/health", timeout=1).status_code == 200:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        logger.error("HTTP server did not become healthy in time")
+        return False
+
+    def stop(self):
+        """Stop the server"""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def endpoints(self, extract: bool) -> Dict[str, Callable[[str], bool]]:
+        """Request functions by endpoint name; each returns True on success"""
+        def transcript(video_id: str) -> bool:
+            response = self.session.get(f"{self.base_url}/transcript", params={"video_id": video_id}, timeout=120)
+            return response.status_code == 200
+
+        def video_info(video_id: str) -> bool:
+            response = self.session.get(f"{self.base_url}/video/info", params={"video_id": video_id}, timeout=60)
+            return response.status_code == 200
+
+        def extraction(video_id: str) -> bool:
+            response = self.session.get(
+                f"{self.base_url}/transcript", params={"video_id": video_id, "force_extract": "true"}, timeout=600
+            )
+            return response.status_code == 200
+
+        endpoints = {"transcript": transcript, "video_info": video_info}
+        if extract:
+            endpoints["extract"] = extraction
+        return endpoints
+
+    def run(self, fn: Callable[[str], bool], ids: List[str], concurrency: int) -> dict:
+        """Send one request per video ID with `concurrency` requests in flight"""
+        latencies = []
+        errors = 0
+
+        def timed(video_id: str) -> Tuple[bool, float]:
+            started = time.perf_counter()
+            try:
+                ok = fn(video_id)
+            except Exception:
+                ok = False
+            return ok, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for ok, latency in executor.map(timed, ids):
+                if ok:
+                    latencies.append(latency)
+                else:
+                    errors += 1
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+class MCPBenchmark:
+    """Drives the MCP server over stdio with concurrent requests on one session"""
+
+    def __init__(self, environment: Dict[str, str]):
+        self.environment = environment
+
+    def endpoints(self, extract: bool) -> Dict[str, Callable]:
+        """Async request functions by endpoint name; each returns True on success"""
+        async def get_transcript(session, video_id: str) -> bool:
+            result = await session.call_tool("get_transcript", {"video_id": video_id})
+            text = "".join(getattr(item, "text", "") for item in result.content)
+            return not result.isError and text.startswith("Video ID:")
+
+        async def video_info(session, video_id: str) -> bool:
+            result = await session.read_resource(f"youtube://{video_id}/info")
+            text = "".join(getattr(item, "text", "") for item in result.contents)
+            return text.startswith("Video Information:")
+
+        async def extraction(session, video_id: str) -> bool:
+            result = await session.call_tool("extract_transcript", {"video_id": video_id})
+            text = "".join(getattr(item, "text", "") for item in result.content)
+            return not result.isError and text.startswith("Video ID:")
+
+        endpoints = {"get_transcript": get_transcript, "video_info_resource": video_info}
+        if extract:
+            endpoints["extract_transcript"] = extraction
+        return endpoints
+
+    async def run(self, session, fn: Callable, ids: List[str], concurrency: int) -> dict:
+        """Send one request per video ID with `concurrency` requests in flight"""
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def timed(video_id: str):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    ok = await fn(session, video_id)
+                except Exception:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(video_id) for video_id in ids))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+def run_http(args, environment: Dict[str, str], results: Dict[str, dict]) -> bool:
+    """Benchmark every HTTP endpoint at every concurrency level"""
+    server = HTTPBenchmark(environment)
+    if not server.start():
+        server.stop()
+        return False
+    try:
+        endpoints = server.endpoints(args.extract)
+        # Warm up imports and connection pools before measuring
+        for fn in endpoints.values():
+            server.run(fn, video_ids(999, 2), 1)
+        for run, (name, fn) in enumerate(endpoints.items()):
+            for concurrency in args.concurrency:
+                # Extraction uses videos without captions
+                prefix = "nc" if name == "extract" else "bm"
+                ids = video_ids(run * 100 + concurrency, args.requests, prefix=prefix, pool=args.id_pool)
+                logger.info(f"http/{name} at concurrency {concurrency}...")
+                results[f"http/{name}/c{concurrency}"] = server.run(fn, ids, concurrency)
+        return True
+    finally:
+        server.stop()
+
+def run_mcp(args, environment: Dict[str, str], results: Dict[str, dict]) -> bool:
+    """Benchmark every MCP tool and resource at every concurrency level"""
+    try:
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+    except ImportError:
+        logger.error("Please install MCP client with: pip install mcp")
+        return False
+
+    benchmark = MCPBenchmark(environment)
+    parameters = StdioServerParameters(
+        command=sys.executable, args=[os.path.join(ROOT_DIR, "mcp_server.py")], env=environment, cwd=ROOT_DIR
+    )
+
+    async def main():
+        async with stdio_client(parameters) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                endpoints = benchmark.endpoints(args.extract)
+                for fn in endpoints.values():
+                    await benchmark.run(session, fn, video_ids(998, 2), 1)
+                for run, (name, fn) in enumerate(endpoints.items()):
+                    for concurrency in args.concurrency:
+                        prefix = "nc" if name == "extract_transcript" else "bm"
+                        ids = video_ids(500 + run * 100 + concurrency, args.requests, prefix=prefix, pool=args.id_pool)
+                        logger.info(f"mcp/{name} at concurrency {concurrency}...")
+                        results[f"mcp/{name}/c{concurrency}"] = await benchmark.run(session, fn, ids, concurrency)
+
+    try:
+        asyncio.run(main())
+        return True
+    except Exception as e:
+        logger.error(f"MCP benchmark failed: {str(e)}")
+        return False
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """List every measurement that regressed past the tolerance"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {result['throughput']:.1f}/s < baseline {base['throughput']:.1f}/s")
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {result[metric]:.1f} > baseline {base[metric]:.1f}")
+        if result["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{key}: error rate {result['error_rate']:.1%} > baseline {base['error_rate']:.1%}")
+    return regressions
+
+def print_report(results: Dict[str, dict], baseline: Dict[str, dict]):
+    """Print one line per endpoint and concurrency level"""
+    logger.info(f"{'benchmark':<40} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7} {'vs p95':>8}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        change = f"{(result['p95_ms'] / base['p95_ms'] - 1):+.0%}" if base and base["p95_ms"] else "-"
+        logger.info(
+            f"{key:<40} {result['throughput']:>8.1f} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+            f"{result['p99_ms']:>7.1f}ms {result['errors']:>7} {change:>8}"
+        )
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Offline benchmark for YouTube Transcript servers")
+    parser.add_argument(
+        "--server-type",
+        choices=["http", "mcp", "both"],
+        default="both",
+        help="Type of server to benchmark (http, mcp, or both)"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20, help="Delay the fake adds to every response")
+    parser.add_argument("--audio-seconds", type=float, default=10, help="Length of the generated audio fixture")
+    parser.add_argument("--audio", help="Audio file for the fake to serve instead of the generated fixture")
+    parser.add_argument("--extract", action="store_true", help="Also benchmark Whisper extraction (slow)")
+    parser.add_argument(
+        "--warm-cache",
+        action="store_true",
+        help="Keep the transcript caches enabled (by default every request misses)"
+    )
+    parser.add_argument("--id-pool", type=int, help="Repeat this many video IDs instead of using unique ones")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression as a fraction")
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+def main() -> int:
+    """Main entry point"""
+    args = parse_args()
+
+    audio = None
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            audio = f.read()
+    fake = FakeYouTube(latency=args.upstream_latency_ms / 1000, audio=audio, audio_seconds=args.audio_seconds)
+    upstream = fake.start()
+
+    results = {}
+    success = True
+    with tempfile.TemporaryDirectory(prefix="benchmark-cache-") as cache_dir:
+        environment = server_environment(upstream, cache_dir, args.warm_cache)
+        try:
+            if args.server_type in ["http", "both"]:
+                success = run_http(args, environment, results) and success
+            if args.server_type in ["mcp", "both"]:
+                success = run_mcp(args, environment, results) and success
+        finally:
+            fake.stop()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+    if not success:
+        logger.error("Benchmark did not complete")
+        return 1
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        logger.info(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        logger.warning(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        logger.error(f"Regression: {regression}")
+    logger.info(f"Benchmark {'FAILED' if regressions else 'PASSED'}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        logger.warning("Benchmark interrupted by user")
+        sys.exit(1)
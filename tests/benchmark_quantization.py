@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark int8 dynamic quantization of the openai-whisper model
+
+Transcribes fixture audio with each model size, first in fp32 and then with
+its Linear layers quantized to int8 (WHISPER_QUANTIZE), and reports the
+real-time factor (transcription seconds per audio second), word error rate
+against the reference transcripts and load/quantize time. Use it to choose
+the model names to list in WHISPER_QUANTIZE.
+
+Fixtures are pairs of <name>.wav (16 kHz mono, or anything ffmpeg decodes)
+and <name>.txt (reference transcript) in --fixtures; none are bundled, so
+point --fixtures at your own recordings. Without any, the script exits with
+an error unless --rtf-only is given, in which case the generated tone
+fixture from fake_youtube.py is used and only the real-time factor is
+reported.
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import wave
+import logging
+import argparse
+from typing import List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from apps.backends import WhisperBackend, load_whisper_model, quantize_whisper_model
+from fake_youtube import make_wav
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "speech")
+SAMPLE_RATE = 16000
+
+def read_audio(data: bytes, path: Optional[str] = None):
+    """16 kHz mono float32 samples from WAV bytes, or from ffmpeg (via Whisper) for other files"""
+    import numpy as np
+
+    try:
+        with wave.open(io.BytesIO(data), "rb") as f:
+            if f.getframerate() == SAMPLE_RATE and f.getnchannels() == 1 and f.getsampwidth() == 2:
+                return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16).astype(np.float32) / 32768.0
+    except wave.Error:
+        pass
+    import whisper
+    return whisper.load_audio(path)
+
+def load_fixtures(directory: str) -> List[Tuple[str, object, Optional[str]]]:
+    """(name, samples, reference_text) per speech fixture in the directory"""
+    fixtures = []
+    if os.path.isdir(directory):
+        for filename in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(filename)
+            if ext == ".txt":
+                continue
+            reference_path = os.path.join(directory, f"{name}.txt")
+            if not os.path.exists(reference_path):
+                logger.warning(f"Skipping {filename}: no {name}.txt reference transcript")
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as f:
+                samples = read_audio(f.read(), path)
+            with open(reference_path) as f:
+                fixtures.append((name, samples, f.read()))
+    return fixtures
+
+def tone_fixture(tone_seconds: float) -> Tuple[str, object, Optional[str]]:
+    """Generated tone with no reference transcript (real-time factor only)"""
+    return ("tone", read_audio(make_wav(tone_seconds)), None)
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words with punctuation removed, so WER only counts word differences"""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Word-level edit distance (substitutions, insertions, deletions) and reference length"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def measure(model, fixtures: list, options: dict, repeats: int) -> dict:
+    """Real-time factor over all fixtures (best of N runs each) and word error rate where references exist"""
+    backend = WhisperBackend()
+    backend.transcribe(model, fixtures[0][1][:SAMPLE_RATE], options)  # First inference allocates buffers
+    audio_seconds = transcribe_seconds = 0.0
+    errors = words = 0
+    for name, samples, reference in fixtures:
+        best, text = None, ""
+        for _ in range(repeats):
+            started = time.perf_counter()
+            text = backend.transcribe(model, samples, options)["text"]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        audio_seconds += len(samples) / SAMPLE_RATE
+        transcribe_seconds += best
+        if reference is not None:
+            fixture_errors, fixture_words = word_errors(reference, text)
+            errors += fixture_errors
+            words += fixture_words
+            logger.info(f"  {name}: {best:.2f}s, WER {fixture_errors / max(fixture_words, 1):.1%}")
+        else:
+            logger.info(f"  {name}: {best:.2f}s")
+    return {
+        "rtf": transcribe_seconds / audio_seconds,
+        "wer": errors / words if words else None,
+        "audio_seconds": audio_seconds
+    }
+
+def benchmark_model(model_name: str, fixtures: list, options: dict, repeats: int) -> dict:
+    """fp32 and int8 measurements for one model size"""
+    started = time.perf_counter()
+    model = load_whisper_model(model_name, quantize=False)
+    load_seconds = time.perf_counter() - started
+    logger.info(f"{model_name} fp32 (loaded in {load_seconds:.1f}s):")
+    fp32 = dict(measure(model, fixtures, options, repeats), load_seconds=load_seconds)
+
+    # Quantizing the loaded model is what load_whisper_model does, without reading the weights twice
+    started = time.perf_counter()
+    model = quantize_whisper_model(model)
+    quantize_seconds = time.perf_counter() - started
+    logger.info(f"{model_name} int8 (quantized in {quantize_seconds:.1f}s):")
+    int8 = dict(measure(model, fixtures, options, repeats), load_seconds=load_seconds + quantize_seconds)
+    return {"fp32": fp32, "int8": int8}
+
+def recommend(result: dict, min_speedup: float, max_wer_increase: float) -> bool:
+    """Quantize when it's fast enough and (if measurable) WER doesn't get much worse"""
+    speedup = result["fp32"]["rtf"] / result["int8"]["rtf"]
+    if speedup < min_speedup:
+        return False
+    if result["fp32"]["wer"] is None:
+        return True
+    return result["int8"]["wer"] - result["fp32"]["wer"] <= max_wer_increase
+
+def print_report(results: dict, min_speedup: float, max_wer_increase: float):
+    """Print one line per model size and the resulting WHISPER_QUANTIZE setting"""
+    def wer(value):
+        return "-" if value is None else f"{value:.1%}"
+
+    logger.info(f"{'model':<10} {'fp32 RTF':>9} {'int8 RTF':>9} {'speedup':>8} {'fp32 WER':>9} {'int8 WER':>9} {'quantize':>9}")
+    enabled = []
+    for model_name, result in results.items():
+        fp32, int8 = result["fp32"], result["int8"]
+        quantize = recommend(result, min_speedup, max_wer_increase)
+        if quantize:
+            enabled.append(model_name)
+        logger.info(
+            f"{model_name:<10} {fp32['rtf']:>9.3f} {int8['rtf']:>9.3f} {fp32['rtf'] / int8['rtf']:>7.2f}x "
+            f"{wer(fp32['wer']):>9} {wer(int8['wer']):>9} {'yes' if quantize else 'no':>9}"
+        )
+    logger.info(f"Suggested setting: WHISPER_QUANTIZE={','.join(enabled) or 'false'}")
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8-quantized Whisper models")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base", "small"], help="Whisper model sizes to compare")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Directory of <name>.wav + <name>.txt pairs")
+    parser.add_argument("--rtf-only", action="store_true",
+                        help="Without speech fixtures, measure the real-time factor on a generated tone (no WER)")
+    parser.add_argument("--tone-seconds", type=float, default=30, help="Length of the --rtf-only tone fixture")
+    parser.add_argument("--language", default="en", help="Language passed to Whisper (skips detection)")
+    parser.add_argument("--repeats", type=int, default=1, help="Transcriptions per fixture; the fastest counts")
+    parser.add_argument("--threads", type=int, help="torch CPU threads (default: torch's choice)")
+    parser.add_argument("--min-speedup", type=float, default=1.2,
+                        help="Smallest fp32/int8 RTF ratio worth quantizing for")
+    parser.add_argument("--max-wer-increase", type=float, default=0.01,
+                        help="Largest absolute WER increase accepted from quantizing")
+    parser.add_argument("--report", help="Write the results as JSON to this file")
+    return parser.parse_args()
+
+def main() -> int:
+    """Main entry point"""
+    args = parse_args()
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        if not args.rtf_only:
+            logger.error(f"No speech fixtures (<name>.wav + <name>.txt) in {args.fixtures}; "
+                         f"pass --fixtures DIR, or --rtf-only to measure the real-time factor without WER")
+            return 1
+        logger.warning(f"No speech fixtures in {args.fixtures}; using a {args.tone_seconds:.0f}s tone "
+                       f"(real-time factor only)")
+        fixtures.append(tone_fixture(args.tone_seconds))
+    options = {"language": args.language, "fp16": False}
+
+    results = {}
+    for model_name in args.models:
+        try:
+            results[model_name] = benchmark_model(model_name, fixtures, options, args.repeats)
+        except Exception as e:
+            logger.error(f"Benchmark of {model_name} failed: {str(e)}")
+            return 1
+
+    print_report(results, args.min_speedup, args.max_wer_increase)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
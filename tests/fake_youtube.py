@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for YouTube, used by the offline benchmark suite
+
+Serves just enough of YouTube for youtube_transcript_api and pytube to work:
+watch pages, the innertube player endpoint, a stub player script, caption
+tracks and audio streams (with Range support). Point the servers at it with
+YOUTUBE_UPSTREAM_URL=http://127.0.0.1:<port>.
+
+Video IDs control the behaviour:
+- IDs starting with "nc" have no caption tracks (forces Whisper extraction)
+- IDs starting with "na" are unavailable
+- any other 11-character ID has English and Vietnamese captions
+"""
+import io
+import json
+import math
+import time
+import wave
+import struct
+import logging
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PLAYER_JS_PATH = "/s/player/fakeplayer/player_ias.vflset/en_US/base.js"
+
+# Smallest player script that pytube's signature and throttling parsers accept.
+# Stream URLs carry "&sig=" so the cipher is never actually applied.
+PLAYER_JS = '''var Bpa=[Nf];
+var Xy={AJ:function(a){a.reverse()}, VR:function(a,b){a.splice(0,b)}};
+Zq=function(a){a=a.split("");Xy.AJ(a,1);Xy.VR(a,2);return a.join("")};
+Nf=function(a){var b=a.split(""),c=[function(d){d.reverse()},b,null];try{c[0](c[1])}catch(e){return"x"}return b.join("")};
+function g(a){a.C&&(b=a.get("n"))&&(b=Bpa[0](b),a.set("n",b))}
+'''
+
+CAPTION_LINES = 40
+
+def make_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    """Generate a mono 16-bit WAV of tone bursts separated by short silences"""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        # 0.8 s of tone, 0.2 s of silence, so silence-based chunking has cut points
+        value = 0.3 * math.sin(2 * math.pi * 440 * t) if (t % 1.0) < 0.8 else 0.0
+        frames += struct.pack("<h", int(value * 32767))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+class FakeYouTube:
+    """Threaded HTTP server that imitates the YouTube endpoints the servers use"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        audio: Optional[bytes] = None,
+        audio_seconds: float = 10.0
+    ):
+        self.latency = latency
+        self.audio = audio if audio is not None else make_wav(audio_seconds)
+        self.audio_seconds = audio_seconds
+        self._lock = threading.Lock()
+        self.requests = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve on a background thread; returns the base URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-youtube", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake YouTube serving at {self.url}")
+        return self.url
+
+    def stop(self):
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def player_response(self, video_id: str) -> dict:
+        """innertube /player response: playability, details, captions and an audio stream"""
+        if video_id.startswith("na"):
+            return {"playabilityStatus": {"status": "ERROR", "reason": "Video unavailable"}}
+
+        response = {
+            "playabilityStatus": {"status": "OK"},
+            "videoDetails": {
+                "videoId": video_id,
+                "title": f"Fake video {video_id}",
+                "author": "Fake Channel",
+                "lengthSeconds": str(int(self.audio_seconds)),
+                "viewCount": "12345",
+                "shortDescription": f"Offline benchmark fixture for {video_id}"
+            },
+            "streamingData": {
+                "adaptiveFormats": [{
+                    "itag": 140,
+                    "url": f"https://rr1---sn-fake.googlevideo.com/videoplayback?id={video_id}&itag=140&sig=fake",
+                    "mimeType": "audio/mp4; codecs=\"mp4a.40.2\"",
+                    "bitrate": 128000,
+                    "contentLength": str(len(self.audio)),
+                    "audioQuality": "AUDIO_QUALITY_MEDIUM",
+                    "approxDurationMs": str(int(self.audio_seconds * 1000))
+                }]
+            }
+        }
+        if not video_id.startswith("nc"):
+            response["captions"] = {
+                "playerCaptionsTracklistRenderer": {
+                    "captionTracks": [
+                        {
+                            "baseUrl": f"https://www.youtube.com/api/timedtext?v={video_id}&lang={lang}",
+                            "name": {"simpleText": name},
+                            "languageCode": lang,
+                            "isTranslatable": False
+                        }
+                        for lang, name in (("en", "English"), ("vi", "Vietnamese"))
+                    ],
+                    "translationLanguages": []
+                }
+            }
+        return response
+
+    def watch_page(self, video_id: str) -> str:
+        player = json.dumps(self.player_response(video_id))
+        return (
+            "<html><head>"
+            f"<meta itemprop=\"datePublished\" content=\"2024-01-01\">"
+            f"<script src=\"{PLAYER_JS_PATH}\"></script>"
+            "</head><body>"
+            f"<script>var ytInitialPlayerResponse = {player};</script>"
+            "</body></html>"
+        )
+
+    def captions(self, video_id: str, lang: str) -> str:
+        lines = "".join(
+            f"<text start=\"{i * 2.5}\" dur=\"2.5\">{escape(f'Line {i} of the {lang} captions for video {video_id}.')}</text>"
+            for i in range(CAPTION_LINES)
+        )
+        return f"<?xml version=\"1.0\" encoding=\"utf-8\" ?><transcript>{lines}</transcript>"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+            def send_body(self, body: bytes, content_type: str, status: int = 200, headers: Optional[dict] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def route(self):
+                parts = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+                if fake.latency:
+                    time.sleep(fake.latency)
+                return parts.path, query
+
+            def do_GET(self):
+                path, query = self.route()
+                fake.count(path)
+                if path == "/watch":
+                    body = fake.watch_page(query.get("v", "")).encode("utf-8")
+                    self.send_body(body, "text/html; charset=utf-8")
+                elif path == "/api/timedtext":
+                    body = fake.captions(query.get("v", ""), query.get("lang", "en")).encode("utf-8")
+                    self.send_body(body, "text/xml; charset=utf-8")
+                elif path == PLAYER_JS_PATH:
+                    self.send_body(PLAYER_JS.encode("utf-8"), "text/javascript")
+                elif path == "/videoplayback":
+                    self.send_audio(query)
+                else:
+                    self.send_body(b"Not found", "text/plain", 404)
+
+            def do_HEAD(self):
+                path, query = self.route()
+                fake.count(path)
+                if path == "/videoplayback":
+                    self.send_audio(query)
+                else:
+                    self.send_body(b"", "text/plain", 404)
+
+            def do_POST(self):
+                path, query = self.route()
+                fake.count(path)
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if path == "/youtubei/v1/player":
+                    video_id = query.get("videoId") or payload.get("videoId", "")
+                    body = json.dumps(fake.player_response(video_id)).encode("utf-8")
+                    self.send_body(body, "application/json")
+                else:
+                    self.send_body(b"{}", "application/json", 404)
+
+            def send_audio(self, query: dict):
+                """Serve the audio fixture, honouring range= (query) and Range (header) requests"""
+                audio = fake.audio
+                total = len(audio)
+                requested = query.get("range")
+                header = self.headers.get("Range")
+                if header and header.startswith("bytes="):
+                    requested = header[len("bytes="):]
+                if not requested:
+                    self.send_body(audio, "audio/mp4")
+                    return
+                start, _, end = requested.partition("-")
+                start = int(start or 0)
+                end = min(int(end) if end else total - 1, total - 1)
+                body = audio[start:end + 1]
+                if header:
+                    self.send_body(body, "audio/mp4", 206, {"Content-Range": f"bytes {start}-{end}/{total}"})
+                else:
+                    self.send_body(body, "audio/mp4")
+
+        return Handler
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for YouTube")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response")
+    parser.add_argument("--audio", help="Audio file to serve instead of the generated tone fixture")
+    parser.add_argument("--audio-seconds", type=float, default=10, help="Length of the generated audio fixture")
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    audio = None
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            audio = f.read()
+    fake = FakeYouTube(port=args.port, latency=args.latency_ms / 1000, audio=audio, audio_seconds=args.audio_seconds)
+    fake.start()
+    logger.info(f"Run the servers with YOUTUBE_UPSTREAM_URL={fake.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cache-key check for extracted transcripts
+
+Runs extract_audio_transcript with a generated audio file and a stand-in
+model (no weights or YouTube access needed) and checks that changing
+WHISPER_QUANTIZE or WHISPER_MODEL transcribes again instead of serving the
+transcript cached for the previous setting, and that switching back hits
+the cache.
+"""
+import os
+import sys
+import logging
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Isolated cache, in-process transcription
+os.environ["TRANSCRIPT_CACHE_DIR"] = tempfile.mkdtemp(prefix="cache-keys-")
+os.environ["TRANSCRIPT_CACHE_ENABLED"] = "true"
+os.environ["WHISPER_WORKERS"] = "0"
+os.environ["CHUNKED_TRANSCRIPTION"] = "false"
+os.environ["STREAMING_EXTRACTION"] = "false"
+os.environ["WHISPER_QUANTIZE"] = "false"
+
+from apps import utils, backends
+from fake_youtube import make_wav
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class StandInModel:
+    """Answers transcribe() with the settings it would run under, and counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        weights = "int8" if backends.should_quantize(utils.WHISPER_MODEL_NAME) else "fp32"
+        return {"text": f"{utils.WHISPER_MODEL_NAME} {weights} transcript", "language": "en", "segments": []}
+
+def fake_download(video_id: str, workspace=None, output_path=None):
+    """Write the generated audio where a download would put it (it's removed after each extraction)"""
+    with open(output_path, "wb") as f:
+        f.write(make_wav(2))
+    return output_path, None
+
+def extract(model: StandInModel, expected: str, transcribes: bool) -> bool:
+    """Extract the test video and check the text and whether the model ran"""
+    calls = model.calls
+    text, _, _, error = utils.extract_audio_transcript("cachekeys01", "en", backend="whisper")
+    ran = model.calls > calls
+    setting = f"model={utils.WHISPER_MODEL_NAME} quantize={backends.WHISPER_QUANTIZE}"
+    if error or text != expected or ran != transcribes:
+        logger.error(f"{setting}: got {text!r} (error {error}, transcribed: {ran}), expected {expected!r} "
+                     f"(transcribed: {transcribes})")
+        return False
+    logger.info(f"{setting}: {'transcribed' if ran else 'cache hit'} -> {text!r}")
+    return True
+
+def main():
+    """Main entry point"""
+    model = StandInModel()
+    utils.MODELS["whisper"] = model
+    utils.download_audio = fake_download
+    utils.WHISPER_MODEL_NAME = "base"
+
+    steps = [
+        ("false", "base", "base fp32 transcript", True),
+        ("false", "base", "base fp32 transcript", False),
+        ("true", "base", "base int8 transcript", True),
+        ("false", "base", "base fp32 transcript", False),
+        ("base", "base", "base int8 transcript", False),
+        ("base", "small", "small fp32 transcript", True),
+        ("true", "small", "small int8 transcript", True),
+    ]
+    ok = True
+    for quantize, model_name, expected, transcribes in steps:
+        backends.WHISPER_QUANTIZE = quantize
+        utils.WHISPER_MODEL_NAME = model_name
+        ok = extract(model, expected, transcribes) and ok
+
+    if not ok:
+        sys.exit(1)
+    logger.info("Extracted transcripts are keyed by model and quantization")
+
+if __name__ == "__main__":
+    main()
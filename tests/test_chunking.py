@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Checks for silence-based chunk boundaries
+
+Splits generated noise, tone-with-gaps and silent audio with a range of
+chunk lengths, including ones shorter than the silence search window, and
+checks that every call finishes and the chunks cover the audio in order,
+each longer than half the chunk length (except the last).
+"""
+import os
+import sys
+import logging
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from apps.chunking import find_chunk_boundaries, check_chunk_seconds, SAMPLE_RATE
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZES = [0.5, 1, 2, 5, 8, 10, 11, 30, 300]
+AUDIO_SECONDS = 120
+# Longest a single find_chunk_boundaries call may take before it counts as hung
+TIMEOUT_SECONDS = 10
+
+def make_audio() -> dict:
+    """Noise, 0.8 s tones separated by 0.2 s near-silences, and pure silence"""
+    rng = np.random.default_rng(0)
+    t = np.arange(AUDIO_SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    gaps = np.where((t % 1.0) < 0.8, 0.3 * np.sin(2 * np.pi * 440 * t), 0.0001 * rng.standard_normal(len(t)))
+    return {
+        "noise": (0.3 * rng.standard_normal(len(t))).astype(np.float32),
+        "tone_gaps": gaps.astype(np.float32),
+        "silence": np.zeros(len(t), dtype=np.float32),
+    }
+
+def boundaries_with_timeout(audio, chunk_seconds: float):
+    """Run find_chunk_boundaries on a thread; None if it doesn't finish in time"""
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(bounds=find_chunk_boundaries(audio, chunk_seconds)), daemon=True
+    )
+    thread.start()
+    thread.join(TIMEOUT_SECONDS)
+    return result.get("bounds")
+
+def check(name: str, audio, chunk_seconds: float) -> bool:
+    """Check that the chunks finish, cover the audio contiguously and aren't too short"""
+    bounds = boundaries_with_timeout(audio, chunk_seconds)
+    if bounds is None:
+        logger.error(f"{name} / {chunk_seconds}s: did not finish within {TIMEOUT_SECONDS}s")
+        return False
+    contiguous = bounds[0][0] == 0 and bounds[-1][1] == len(audio) and all(
+        end == next_start for (_, end), (next_start, _) in zip(bounds, bounds[1:])
+    )
+    lengths = [(end - start) / SAMPLE_RATE for start, end in bounds]
+    too_short = [length for length in lengths[:-1] if length <= chunk_seconds / 2]
+    if not contiguous or too_short:
+        logger.error(f"{name} / {chunk_seconds}s: bad chunks {[round(length, 1) for length in lengths]}")
+        return False
+    logger.info(f"{name} / {chunk_seconds}s: {len(bounds)} chunks, "
+                f"{min(lengths[:-1] or lengths):.1f}-{max(lengths):.1f}s")
+    return True
+
+def check_settings() -> bool:
+    """Chunk settings below MIN_CHUNK_SECONDS are rejected"""
+    ok = True
+    for seconds in [0, -5, 0.5, float("nan")]:
+        try:
+            check_chunk_seconds("TRANSCRIBE_CHUNK_SECONDS", seconds)
+            logger.error(f"Chunk setting {seconds} was accepted")
+            ok = False
+        except ValueError as e:
+            logger.info(f"Rejected: {e}")
+    return ok
+
+def main():
+    """Main entry point"""
+    ok = check_settings()
+    for name, audio in make_audio().items():
+        for chunk_seconds in CHUNK_SIZES:
+            ok = check(name, audio, chunk_seconds) and ok
+    if not ok:
+        sys.exit(1)
+    logger.info("All chunk boundary checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the server modules
+
+Imports each server module in a fresh interpreter and fails when it takes
+longer than the budget, or when it pulls in a heavy dependency that only
+Whisper extraction needs (torch, whisper, faster-whisper, pytube, numpy).
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+import subprocess
+from typing import List
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be loaded once a request actually needs Whisper or pytube
+HEAVY_MODULES = ["torch", "whisper", "faster_whisper", "ctranslate2", "pytube", "numpy"]
+
+# Run in a fresh interpreter, so nothing imported by this script skews the result
+PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def measure(module: str, repeats: int) -> dict:
+    """Best-of-N import time of a module, and which heavy modules it loaded"""
+    best = None
+    for _ in range(repeats):
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            return {"module": module, "error": completed.stderr.strip().splitlines()[-1:] or ["unknown error"]}
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return dict(best, module=module)
+
+def check(modules: List[str], budget: float, repeats: int) -> bool:
+    """Measure each module and log whether it stays within the budget"""
+    ok = True
+    for module in modules:
+        result = measure(module, repeats)
+        if "error" in result:
+            logger.error(f"{module}: import failed: {result['error'][0]}")
+            ok = False
+            continue
+        status = "OK"
+        if result["loaded"]:
+            status = f"FAIL (loaded {', '.join(result['loaded'])})"
+            ok = False
+        elif result["seconds"] > budget:
+            status = f"FAIL (over the {budget:.2f}s budget)"
+            ok = False
+        logger.info(f"{module}: {result['seconds']:.3f}s {status}")
+    return ok
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Check server import time and heavy-module usage")
+    parser.add_argument("--modules", nargs="+", default=["apps.flask_server", "apps.mcp_server"],
+                        help="Modules to import")
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("IMPORT_BUDGET_SECONDS", "2.0")),
+                        help="Maximum import time per module, in seconds")
+    parser.add_argument("--repeats", type=int, default=3, help="Imports per module; the fastest counts")
+    return parser.parse_args()
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+    if not check(args.modules, args.budget, args.repeats):
+        sys.exit(1)
+    logger.info("All modules within the import budget")
+
+if __name__ == "__main__":
+    main()
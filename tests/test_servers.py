@@ -10,9 +10,17 @@ import argparse
 import subprocess
 import signal
 import sys
+import asyncio
+import threading
 import requests
+from collections import Counter
 from typing import Optional, Dict, List, Any, Tuple
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,12 +28,115 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Upper bounds (ms) of the latency histogram buckets in load reports
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+class ResourceSampler:
+    """Samples RSS and CPU of a server process (and its children) on a background thread"""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.samples = []
+        self._process = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self, pid: int):
+        """Start sampling the process tree rooted at pid"""
+        if psutil is None:
+            logger.warning("psutil is not installed; server RSS/CPU will not be recorded")
+            return
+        self._process = psutil.Process(pid)
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+    
+    def _run(self):
+        known = {}
+        while not self._stop.is_set():
+            try:
+                processes = [self._process] + self._process.children(recursive=True)
+                rss = 0
+                cpu = 0.0
+                for process in processes:
+                    # cpu_percent() needs one earlier call per process to measure against
+                    process = known.setdefault(process.pid, process)
+                    try:
+                        rss += process.memory_info().rss
+                        cpu += process.cpu_percent()
+                    except psutil.NoSuchProcess:
+                        pass
+                self.samples.append({
+                    "t": round(time.time() - self._started, 2),
+                    "processes": len(processes),
+                    "rss_bytes": rss,
+                    "cpu_percent": round(cpu, 1)
+                })
+            except psutil.NoSuchProcess:
+                return
+            self._stop.wait(self.interval)
+
+class LoadRecorder:
+    """Collects request outcomes from virtual clients and summarizes them per endpoint"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+    
+    def record(self, endpoint: str, latency: float, ok: bool, status: Any):
+        with self._lock:
+            self.records.append((endpoint, latency, ok, str(status)))
+    
+    def summary(self, duration: float) -> Dict[str, dict]:
+        """Latency distribution, error rate and throughput per endpoint"""
+        from benchmark import percentile
+        
+        with self._lock:
+            records = list(self.records)
+        endpoints = {}
+        for endpoint in dict.fromkeys(record[0] for record in records):
+            rows = [record for record in records if record[0] == endpoint]
+            latencies_ms = [latency * 1000 for _, latency, ok, _ in rows if ok]
+            errors = sum(1 for row in rows if not row[2])
+            histogram = {}
+            for bound in LATENCY_BUCKETS_MS + [float("inf")]:
+                label = f"le_{bound}" if bound != float("inf") else "le_inf"
+                histogram[label] = sum(1 for latency in latencies_ms if latency <= bound)
+            endpoints[endpoint] = {
+                "requests": len(rows),
+                "errors": errors,
+                "error_rate": errors / len(rows) if rows else 0.0,
+                "throughput": len(rows) / duration if duration else 0.0,
+                "status_codes": dict(Counter(row[3] for row in rows)),
+                "p50_ms": percentile(latencies_ms, 50),
+                "p90_ms": percentile(latencies_ms, 90),
+                "p95_ms": percentile(latencies_ms, 95),
+                "p99_ms": percentile(latencies_ms, 99),
+                "max_ms": max(latencies_ms, default=0.0),
+                "histogram_ms": histogram
+            }
+        return endpoints
+
 class ServerTester:
     """Test runner for YouTube Transcript servers"""
     
-    def __init__(self, server_type: str = "http", port: int = 5001, video_ids: List[str] = None):
+    def __init__(
+        self, 
+        server_type: str = "http", 
+        port: int = 5001, 
+        video_ids: List[str] = None, 
+        environment: Optional[Dict[str, str]] = None
+    ):
         self.server_type = server_type.lower()
         self.port = port
+        # Extra environment variables for the server process
+        self.environment = environment or {}
         
         # Default test video IDs if none provided
         if not video_ids:
@@ -48,10 +159,10 @@ class ServerTester:
             # Determine which server to start
             if self.server_type == "http":
                 cmd = ["python", "server.py"]
-                environment = os.environ.copy()
+                environment = {**os.environ, **self.environment}
             elif self.server_type == "mcp":
                 cmd = ["python", "mcp_server.py"]
-                environment = os.environ.copy()
+                environment = {**os.environ, **self.environment}
             else:
                 logger.error(f"Unknown server type: {self.server_type}")
                 return False
@@ -279,6 +390,151 @@ class ServerTester:
             logger.error(f"Error running MCP tests: {str(e)}")
             return False
     
+    def run_load_test(
+        self, 
+        max_clients: int = 32, 
+        ramp_step: int = 4, 
+        step_duration: float = 30
+    ) -> Dict[str, Any]:
+        """
+        Ramp up concurrent virtual clients and measure the server under load
+        
+        Each step runs `clients` virtual clients for step_duration seconds,
+        each sending requests back to back and cycling through the endpoints
+        and video IDs. Server RSS/CPU is sampled throughout.
+        
+        Returns:
+            Report with per-step, per-endpoint latency distributions and error
+            rates, plus the resource samples
+        """
+        steps = list(range(ramp_step, max_clients + 1, ramp_step)) or [max_clients]
+        report = {
+            "server_type": self.server_type,
+            "video_ids": self.video_ids,
+            "config": {"max_clients": max_clients, "ramp_step": ramp_step, "step_duration": step_duration},
+            "steps": [],
+            "resources": []
+        }
+        sampler = ResourceSampler()
+        
+        if self.server_type == "http":
+            if not self.start_server():
+                report["error"] = "Server failed to start"
+                return report
+            try:
+                sampler.start(self.server_process.pid)
+                for clients in steps:
+                    report["steps"].append(self._http_load_step(clients, step_duration))
+            finally:
+                sampler.stop()
+                self.stop_server()
+        else:
+            try:
+                asyncio.run(self._mcp_load(steps, step_duration, sampler, report))
+            except Exception as e:
+                logger.error(f"MCP load test failed: {str(e)}")
+                report["error"] = str(e)
+            finally:
+                sampler.stop()
+        
+        report["resources"] = sampler.samples
+        return report
+    
+    def _http_load_step(self, clients: int, duration: float) -> Dict[str, Any]:
+        """Run one load step against the HTTP endpoints"""
+        logger.info(f"Load step: {clients} virtual clients for {duration}s")
+        endpoints = [
+            ("transcript", "/transcript"),
+            ("video_info", "/video/info")
+        ]
+        recorder = LoadRecorder()
+        deadline = time.time() + duration
+        
+        def client(index: int):
+            session = requests.Session()
+            sent = index
+            while time.time() < deadline:
+                name, path = endpoints[sent % len(endpoints)]
+                video_id = self.video_ids[(sent // len(endpoints)) % len(self.video_ids)]
+                sent += 1
+                started = time.perf_counter()
+                try:
+                    response = session.get(f"{self.base_url}{path}", params={"video_id": video_id}, timeout=300)
+                    status = response.status_code
+                except Exception as e:
+                    status = type(e).__name__
+                recorder.record(name, time.perf_counter() - started, status == 200, status)
+        
+        started = time.time()
+        threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - started
+        return {"clients": clients, "duration": elapsed, "endpoints": recorder.summary(elapsed)}
+    
+    async def _mcp_load(self, steps: List[int], duration: float, sampler: ResourceSampler, report: Dict[str, Any]):
+        """Run every load step against the MCP server over one stdio session"""
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        
+        parameters = StdioServerParameters(
+            command=sys.executable, 
+            args=["mcp_server.py"], 
+            env={**os.environ, **self.environment}
+        )
+        async with stdio_client(parameters) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                
+                # The MCP server is a child of this process
+                if psutil is not None:
+                    for child in psutil.Process().children(recursive=True):
+                        if "mcp_server.py" in " ".join(child.cmdline()):
+                            sampler.start(child.pid)
+                            break
+                
+                for clients in steps:
+                    report["steps"].append(await self._mcp_load_step(session, clients, duration))
+    
+    async def _mcp_load_step(self, session, clients: int, duration: float) -> Dict[str, Any]:
+        """Run one load step against the MCP tools"""
+        logger.info(f"Load step: {clients} virtual MCP clients for {duration}s")
+        recorder = LoadRecorder()
+        deadline = time.time() + duration
+        
+        async def get_transcript(video_id: str) -> bool:
+            result = await session.call_tool("get_transcript", {"video_id": video_id})
+            text = "".join(getattr(item, "text", "") for item in result.content)
+            return not result.isError and text.startswith("Video ID:")
+        
+        async def video_info(video_id: str) -> bool:
+            result = await session.read_resource(f"youtube://{video_id}/info")
+            text = "".join(getattr(item, "text", "") for item in result.contents)
+            return text.startswith("Video Information:")
+        
+        endpoints = [("get_transcript", get_transcript), ("video_info_resource", video_info)]
+        
+        async def client(index: int):
+            sent = index
+            while time.time() < deadline:
+                name, call = endpoints[sent % len(endpoints)]
+                video_id = self.video_ids[(sent // len(endpoints)) % len(self.video_ids)]
+                sent += 1
+                started = time.perf_counter()
+                try:
+                    ok = await call(video_id)
+                    status = "ok" if ok else "error"
+                except Exception as e:
+                    ok, status = False, type(e).__name__
+                recorder.record(name, time.perf_counter() - started, ok, status)
+        
+        started = time.time()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        elapsed = time.time() - started
+        return {"clients": clients, "duration": elapsed, "endpoints": recorder.summary(elapsed)}
+    
     def run_tests(self) -> bool:
         """Run all tests for the specified server type"""
         try:
@@ -334,9 +590,90 @@ def parse_args():
         nargs="+",
         help="Video IDs to test with (space-separated)"
     )
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="Run a load test (ramping concurrent clients) instead of the correctness tests"
+    )
+    parser.add_argument(
+        "--max-clients",
+        type=int,
+        default=32,
+        help="Load test: number of concurrent virtual clients at the last step"
+    )
+    parser.add_argument(
+        "--ramp-step",
+        type=int,
+        default=4,
+        help="Load test: clients added at each step"
+    )
+    parser.add_argument(
+        "--step-duration",
+        type=float,
+        default=30,
+        help="Load test: seconds each step runs"
+    )
+    parser.add_argument(
+        "--report",
+        default="load_report.json",
+        help="Load test: file the JSON report is written to"
+    )
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.01,
+        help="Load test: fail when any endpoint's error rate at any step exceeds this fraction"
+    )
+    parser.add_argument(
+        "--fake-youtube",
+        action="store_true",
+        help="Point the server at the local YouTube stand-in instead of live YouTube"
+    )
     
     return parser.parse_args()
 
+def run_load(args) -> bool:
+    """Run load tests for the selected servers, write the JSON report and check the error-rate threshold"""
+    environment = {}
+    fake = None
+    if args.fake_youtube:
+        from fake_youtube import FakeYouTube
+        
+        fake = FakeYouTube()
+        environment["YOUTUBE_UPSTREAM_URL"] = fake.start()
+    
+    server_types = ["http", "mcp"] if args.server_type == "both" else [args.server_type]
+    reports = []
+    try:
+        for server_type in server_types:
+            logger.info(f"\n\nLOAD TESTING {server_type.upper()} SERVER\n\n")
+            tester = ServerTester(server_type, args.port, args.video_ids, environment)
+            reports.append(tester.run_load_test(args.max_clients, args.ramp_step, args.step_duration))
+    finally:
+        if fake:
+            fake.stop()
+    
+    with open(args.report, "w") as f:
+        json.dump({"created_at": time.time(), "fake_youtube": args.fake_youtube, "servers": reports}, f, indent=2)
+    logger.info(f"Load report written to {args.report}")
+    
+    success = all("error" not in report for report in reports)
+    for report in reports:
+        for step in report["steps"]:
+            for endpoint, stats in step["endpoints"].items():
+                logger.info(
+                    f"{report['server_type']} {step['clients']:>3} clients {endpoint:<20} "
+                    f"{stats['throughput']:.1f} req/s  p50 {stats['p50_ms']:.0f}ms  "
+                    f"p99 {stats['p99_ms']:.0f}ms  errors {stats['error_rate']:.1%}"
+                )
+                if stats["error_rate"] > args.max_error_rate:
+                    logger.error(
+                        f"{report['server_type']} {endpoint} at {step['clients']} clients: error rate "
+                        f"{stats['error_rate']:.1%} exceeds {args.max_error_rate:.1%}"
+                    )
+                    success = False
+    return success
+
 def main():
     """Main entry point"""
     args = parse_args()
@@ -350,6 +687,13 @@ def main():
         logger.info(f"Video IDs: {', '.join(args.video_ids)}")
     logger.info(f"{'='*80}\n")
     
+    if args.load:
+        success = run_load(args)
+        logger.info(f"\nLoad test {'COMPLETED' if success else 'FAILED'}\n")
+        if not success:
+            sys.exit(1)
+        return
+    
     # Run tests based on server type
     if args.server_type in ["http", "both"]:
         logger.info("\n\nTESTING HTTP SERVER\n\n")